@@ -1,6 +1,7 @@
 'use client'
 import React, { useState } from 'react';
 import { Activity, Zap, Server, Navigation, Clock, CloudRain, AlertTriangle, Map, Settings } from 'lucide-react';
+import { fetchAnalysis } from '@/lib/training';
 
 const OverallPage = () => {
     const [trafficMetrics, setTrafficMetrics] = useState(null);
@@ -19,18 +20,37 @@ const OverallPage = () => {
 
     const [optimizationResult, setOptimizationResult] = useState(null);
     const [isOptimizing, setIsOptimizing] = useState(false);
+    const [optimizationProgress, setOptimizationProgress] = useState(null);
 
     const runOptimization = async () => {
         setIsOptimizing(true);
+        setOptimizationProgress(null);
         try {
-            const res = await fetch('http://127.0.0.1:8000/optimization/run_routing', {
+            // Submit as a background job and follow its convergence over Server-Sent Events
+            const res = await fetch('http://127.0.0.1:8000/optimization/jobs', {
                 method: 'POST'
             });
-            const data = await res.json();
-            if (res.ok) setOptimizationResult(data);
+            const { job_id } = await res.json();
+            if (!res.ok) throw new Error("Job submission failed");
+
+            const stream = new EventSource(`http://127.0.0.1:8000/optimization/jobs/${job_id}/stream`);
+            stream.addEventListener('progress', (e) => setOptimizationProgress(JSON.parse(e.data)));
+            stream.addEventListener('done', (e) => {
+                setOptimizationResult(JSON.parse(e.data).result);
+                stream.close();
+                setIsOptimizing(false);
+            });
+            stream.addEventListener('failed', (e) => {
+                console.error("Optimization failed:", JSON.parse(e.data).error);
+                stream.close();
+                setIsOptimizing(false);
+            });
+            stream.onerror = () => {
+                stream.close();
+                setIsOptimizing(false);
+            };
         } catch (error) {
             console.error("Optimization failed:", error);
-        } finally {
             setIsOptimizing(false);
         }
     };
@@ -38,17 +58,16 @@ const OverallPage = () => {
     const runDiagnosis = async () => {
         setIsAnalyzing(true);
         try {
-            // Run parallel requests
-            const [trafficRes, weatherRes] = await Promise.all([
-                fetch('http://127.0.0.1:8000/traffic/get_analysis', { method: 'POST' }),
-                fetch('http://127.0.0.1:8000/weather/get_analysis', { method: 'POST' })
+            // Run parallel requests (each returns saved metrics or waits on its training job)
+            const [trafficResult, weatherResult] = await Promise.allSettled([
+                fetchAnalysis('traffic'),
+                fetchAnalysis('weather')
             ]);
 
-            const trafficData = await trafficRes.json();
-            const weatherData = await weatherRes.json();
-
-            if (trafficRes.ok) setTrafficMetrics(trafficData.analysis);
-            if (weatherRes.ok) setWeatherMetrics(weatherData.analysis);
+            if (trafficResult.status === 'fulfilled') setTrafficMetrics(trafficResult.value);
+            else console.error("Traffic analysis failed:", trafficResult.reason);
+            if (weatherResult.status === 'fulfilled') setWeatherMetrics(weatherResult.value);
+            else console.error("Weather analysis failed:", weatherResult.reason);
 
         } catch (error) {
             console.error("Diagnosis failed:", error);
@@ -164,7 +183,9 @@ const OverallPage = () => {
                         className="bg-pink-600 hover:bg-pink-700 disabled:opacity-50 text-white px-6 py-2 rounded-lg font-medium flex items-center gap-2 transition-all"
                     >
                         {isOptimizing ? <Activity className="animate-spin w-4 h-4" /> : <Settings className="w-4 h-4" />}
-                        {isOptimizing ? 'Optimizing Routes...' : 'Run Hybrid Optimization'}
+                        {isOptimizing
+                            ? (optimizationProgress ? `Iteration ${optimizationProgress.iteration} (${optimizationProgress.gbest_fitness.toFixed(4)})` : 'Optimizing Routes...')
+                            : 'Run Hybrid Optimization'}
                     </button>
                 </div>
 
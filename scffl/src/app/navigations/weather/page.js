@@ -1,28 +1,24 @@
 'use client'
 import React, { useState } from 'react'
 import { Cloud, Activity, Wind, Droplets, Eye, AlertCircle } from 'lucide-react';
+import { fetchAnalysis } from '@/lib/training';
 
 function page() {
     const [analysis, setAnalysis] = useState(null);
     const [datasetInfo, setDatasetInfo] = useState(null);
     const [loading, setLoading] = useState(false);
     const [error, setError] = useState(null);
+    const [progress, setProgress] = useState(null);
 
     const runAnalysis = async () => {
         setLoading(true);
         setError(null);
+        setProgress(null);
         try {
-            const response = await fetch('http://127.0.0.1:8000/weather/get_analysis', {
-                method: 'POST',
-            });
-            const data = await response.json();
-            if (response.ok) {
-                setAnalysis(data.analysis);
-            } else {
-                setError(data.detail || 'Analysis failed');
-            }
+            // Returns saved metrics at once, or waits on the background training job
+            setAnalysis(await fetchAnalysis('weather', { onProgress: setProgress }));
         } catch (err) {
-            setError('Failed to connect to server');
+            setError(err instanceof TypeError ? 'Failed to connect to server' : err.message);
         } finally {
             setLoading(false);
         }
@@ -49,7 +45,7 @@ function page() {
                         className="bg-blue-600 hover:bg-blue-700 disabled:bg-blue-800 text-white px-6 py-2 rounded-lg font-semibold flex items-center space-x-2 transition-colors"
                     >
                         {loading ? <Activity className="animate-spin w-5 h-5" /> : <Activity className="w-5 h-5" />}
-                        <span>{loading ? 'Analyzing...' : 'Analyze Weather Models'}</span>
+                        <span>{loading ? (progress ? `Training epoch ${progress.epoch}/${progress.epochs}...` : 'Analyzing...') : 'Analyze Weather Models'}</span>
                     </button>
                 </div>
             </div>
@@ -0,0 +1,22 @@
+const API_URL = 'http://127.0.0.1:8000';
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Requests the traffic/weather model analysis. Cached metrics come back directly; otherwise the
+// server queues a training job and this polls it until done, reporting epoch progress on the way.
+export async function fetchAnalysis(kind, { intervalMs = 2000, onProgress } = {}) {
+  const response = await fetch(`${API_URL}/${kind}/get_analysis`, { method: 'POST' });
+  const data = await response.json();
+  if (!response.ok) throw new Error(data.detail || 'Analysis failed');
+  if (data.analysis) return data.analysis;
+
+  while (true) {
+    await sleep(intervalMs);
+    const res = await fetch(`${API_URL}/training/jobs/${data.job_id}`);
+    const job = await res.json();
+    if (!res.ok) throw new Error(job.detail || 'Analysis failed');
+    if (job.progress && onProgress) onProgress(job.progress);
+    if (job.status === 'done') return job.result;
+    if (job.status === 'failed') throw new Error(job.error || 'Training failed');
+  }
+}
@@ -1,16 +1,75 @@
+import time
+STARTED_AT = time.perf_counter()
+
+import sys
+import json
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from models.hub_optimizer import get_optimized_hubs
-from models.traffic_analyzer import traffic_analyzer
-from models.weather_analyzer import weather_analyzer
-from models.results_analyzer import results_analyzer
-from models.benchmark_runner import benchmark_runner
-from models.dataset_utils import get_traffic_dataset_info, get_weather_dataset_info, get_vehicle_dataset_info
+from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
+from models.job_manager import JobManager, JobQueueFull
+from models.warmup import WarmUp
 from pydantic import BaseModel
 
+# Analyzers, optimizers and dataset helpers (pandas, scikit-learn, TensorFlow) are imported
+# inside the endpoints that use them, so the app answers /health as soon as uvicorn binds.
+# The warm-up thread below pulls them in and loads the models in the background.
+
+# Bounded pool for long-running optimization jobs so the API stays responsive
+job_manager = JobManager(max_workers=2, max_pending=8)
+
+def get_optimizer():
+    from models.optimization.iqpso_sa import iqpso_sa_optimizer
+    return iqpso_sa_optimizer
+
+# Live per-vehicle plans; only the unvisited suffix is re-optimized when an event touches a route
+rerouting_service = None
+rerouting_lock = threading.Lock()
+
+def get_rerouting_service():
+    global rerouting_service
+    with rerouting_lock:
+        if rerouting_service is None:
+            from models.optimization.rerouting import ReroutingService
+            rerouting_service = ReroutingService(get_optimizer(), replan_budget_ms=250.0)
+    return rerouting_service
+
+def warm_traffic_model():
+    from models.traffic_analyzer import traffic_analyzer
+    traffic_analyzer.load_artifacts()
 
+def warm_weather_model():
+    from models.weather_analyzer import weather_analyzer
+    weather_analyzer.load_artifacts()
 
-app = FastAPI()
+def warm_vehicle_pool():
+    from models.optimization.vehicle_pool import vehicle_pool
+    vehicle_pool.load()
+
+warmup = WarmUp()
+warmup.add("traffic_model", warm_traffic_model)
+warmup.add("weather_model", warm_weather_model)
+warmup.add("optimizer", get_optimizer)
+warmup.add("vehicle_pool", warm_vehicle_pool, required=False)
+
+startup_timing = {"import_s": None, "startup_s": None}
+
+@asynccontextmanager
+async def lifespan(app):
+    startup_timing["startup_s"] = round(time.perf_counter() - STARTED_AT, 3)
+    warmup.start()
+    yield
+    if rerouting_service is not None:
+        rerouting_service.stop()
+    job_manager.shutdown()
+    training_manager.shutdown()
+    if "models.optimization.iqpso_sa" in sys.modules:
+        from models.optimization.iqpso_sa import shutdown_process_pool
+        shutdown_process_pool()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -43,6 +102,17 @@ PRICE_LIST = {
 def root():
     return {"message": "FastAPI is running"}
 
+@app.get("/health")
+def health():
+    # Liveness: the process is up and serving; never touches models or data
+    return {"status": "ok", "uptime_s": round(time.perf_counter() - STARTED_AT, 3), **startup_timing}
+
+@app.get("/ready")
+def ready():
+    # Readiness: 503 until the warm-up has loaded the models and the optimizer
+    report = warmup.report()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content={**report, **startup_timing})
+
 @app.get("/get_all_available_products")
 def get_all_available_products():
     return {
@@ -67,41 +137,78 @@ def get_hubs():
     from models.hub_optimizer import get_optimized_hubs
     return {"hubs": get_optimized_hubs()}
 
+# LSTM training runs as background jobs, one at a time and apart from the routing pool
+training_manager = JobManager(max_workers=1, max_pending=4)
+training_jobs = {}  # "traffic" / "weather" -> latest training job_id
+training_lock = threading.Lock()
+
+class TrainingRequest(BaseModel):
+    epochs: int = 20
+    batch_size: int = 32
+    force: bool = False  # retrain even if the dataset and settings match the saved model
+
+def run_training(analyzer, request, progress=None):
+    return analyzer.train_model(epochs=request.epochs, batch_size=request.batch_size, progress=progress)
+
+def request_analysis(kind, analyzer, request):
+    # Saved metrics come back at once when the dataset hash and hyperparameters are unchanged;
+    # otherwise training is queued (or the one already running is reused) and a job_id returned
+    request = request or TrainingRequest()
+    if not request.force:
+        metrics = analyzer.cached_metrics(request.epochs, request.batch_size)
+        if metrics is not None:
+            return {"analysis": metrics, "cached": True}
+    
+    with training_lock:
+        job = training_manager.get(training_jobs.get(kind), include_events=False) if kind in training_jobs else None
+        if job is None or job["status"] not in ("queued", "running"):
+            try:
+                job_id = training_manager.submit(f"train_{kind}", run_training, analyzer, request)
+            except JobQueueFull as e:
+                raise HTTPException(status_code=429, detail=str(e))
+            training_jobs[kind] = job_id
+            job = {"job_id": job_id, "status": "queued"}
+    return JSONResponse(status_code=202, content={"job_id": job["job_id"], "status": job["status"]})
+
 @app.post("/traffic/get_analysis")
-def get_traffic_analysis():
-    try:
-        # Train model and get metrics
-        # In production this should be async or background task
-        metrics = traffic_analyzer.train_model(epochs=20)
-        return {"analysis": metrics}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+def get_traffic_analysis(request: TrainingRequest = None):
+    from models.traffic_analyzer import traffic_analyzer
+    return request_analysis("traffic", traffic_analyzer, request)
 
 @app.post("/weather/get_analysis")
-def get_weather_analysis():
-    try:
-        # Train model and get metrics
-        metrics = weather_analyzer.train_model(epochs=20)
-        return {"analysis": metrics}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+def get_weather_analysis(request: TrainingRequest = None):
+    from models.weather_analyzer import weather_analyzer
+    return request_analysis("weather", weather_analyzer, request)
+
+@app.get("/training/jobs/{job_id}")
+def get_training_job(job_id: str):
+    job = training_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    events = job.pop("events")
+    job["progress"] = events[-1] if events else None  # latest {"epoch", "epochs", "loss", "val_loss"}
+    return job
 
 @app.get("/traffic/get_dataset_info")
 def get_traffic_data_info():
+    from models.dataset_utils import get_traffic_dataset_info
     return get_traffic_dataset_info()
 
 @app.get("/weather/get_dataset_info")
 def get_weather_data_info():
+    from models.dataset_utils import get_weather_dataset_info
     return get_weather_dataset_info()
 
 
 @app.get("/vehicle/get_dataset_info")
 def get_vehicle_data_info():
+    from models.dataset_utils import get_vehicle_dataset_info
     return get_vehicle_dataset_info()
 
 @app.get("/result-benchmark")
 def get_benchmark_results():
     print("Received benchmark request. Starting simulation...")
+    from models.benchmark_runner import benchmark_runner
     try:
         data = benchmark_runner.run_benchmark_simulation()
         return data
@@ -111,8 +218,6 @@ def get_benchmark_results():
         return {"error": str(e)}
 
 
-from models.optimization.iqpso_sa import iqpso_sa_optimizer
-
 class DeliveryRequest(BaseModel):
     route_name: str
     range_km: float
@@ -122,6 +227,7 @@ class DeliveryRequest(BaseModel):
 def predict_delivery(request: DeliveryRequest):
     try:
         from datetime import datetime
+        from models.results_analyzer import results_analyzer
         # Use provided start_time or default to current time
         current_time = request.start_time if request.start_time else datetime.now().strftime("%H:%M")
         
@@ -130,13 +236,273 @@ def predict_delivery(request: DeliveryRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+class DeliveryBatchRequest(BaseModel):
+    deliveries: list  # [{"route_name", "range_km", "start_time"?, vehicle attributes?}]
+
+@app.post("/overall/predict_deliveries")
+def predict_deliveries(request: DeliveryBatchRequest):
+    # Model-only estimates for many deliveries in one batched forward pass
+    from models.results_analyzer import results_analyzer
+    try:
+        return {"results": results_analyzer.predict_deliveries(request.deliveries)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+class RoutingRequest(BaseModel):
+    parallel_runs: int = 0  # > 1 runs that many independent swarms on the process pool
+    islands: int = 0  # > 1 runs the island model with that many sub-swarms
+    migration_interval: int = 10
+    topology: str = "ring"  # "ring" or "full"
+    latency_ms: float = None  # wall-clock budget (SLA) for the search itself
+    local_search_interval: int = None  # 2-opt / Or-opt on gbest every K iterations
+    start_time: str = None  # departure "HH:MM"; defaults to now
+    seed_solution: list = None  # previous best_sequence or gbest_position to warm-start from
+    pareto: bool = False  # return the whole cost vs satisfaction front instead of one w1/w2 trade-off
+    archive_size: int = 50  # max Pareto front size (crowding-distance pruning)
+
+def run_routing(request, optimizer, progress=None):
+    # Single swarm streams every iteration; pooled/island modes only report when they finish
+    on_iteration = None
+    if progress is not None:
+        on_iteration = lambda it, fitness: progress({"iteration": it, "gbest_fitness": float(fitness)})
+    
+    if request.pareto:
+        if progress is not None:
+            on_iteration = lambda it, hv: progress({"iteration": it, "hypervolume": float(hv)})
+        return optimizer.optimize_pareto(
+            archive_size=request.archive_size,
+            time_budget_ms=request.latency_ms,
+            start_time=request.start_time,
+            on_iteration=on_iteration
+        )
+    if request.islands > 1:
+        return optimizer.optimize_islands(
+            n_islands=request.islands,
+            migration_interval=request.migration_interval,
+            topology=request.topology,
+            time_budget_ms=request.latency_ms,
+            local_search_interval=request.local_search_interval,
+            start_time=request.start_time
+        )
+    if request.parallel_runs > 1:
+        return optimizer.optimize_parallel(
+            n_runs=request.parallel_runs,
+            time_budget_ms=request.latency_ms,
+            local_search_interval=request.local_search_interval,
+            start_time=request.start_time
+        )
+    return optimizer.optimize(
+        time_budget_ms=request.latency_ms,
+        local_search_interval=request.local_search_interval,
+        start_time=request.start_time,
+        on_iteration=on_iteration,
+        seed_solution=request.seed_solution
+    )
+
 @app.post("/optimization/run_routing")
-def run_routing_optimization():
+def run_routing_optimization(request: RoutingRequest = None):
     try:
-        result = iqpso_sa_optimizer.optimize()
-        return result
+        return run_routing(request or RoutingRequest(), get_optimizer())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/optimization/cache_stats")
+def get_routing_cache_stats():
+    return get_optimizer().result_cache.stats()
+
+@app.get("/predictions/cache_stats")
+def get_prediction_cache_stats():
+    from models.traffic_analyzer import traffic_analyzer
+    from models.weather_analyzer import weather_analyzer
+    return {
+        "traffic": traffic_analyzer.prediction_cache.stats(),
+        "weather": weather_analyzer.prediction_cache.stats()
+    }
+
+@app.get("/models/status")
+def get_model_status():
+    # Backend, load / warm-up time and memory of the served LSTMs
+    from models.traffic_analyzer import traffic_analyzer
+    from models.weather_analyzer import weather_analyzer
+    return {
+        "traffic": traffic_analyzer.holder.stats(),
+        "weather": weather_analyzer.holder.stats()
+    }
+
+@app.post("/predictions/quantization_report")
+def get_quantization_report(quantization: str = "dynamic", sample_size: int = 500):
+    # Exports both LSTMs to TFLite and reports accuracy deltas vs Keras (needs TensorFlow)
+    from models.inference import quantization_report
+    from models.traffic_analyzer import traffic_analyzer
+    from models.weather_analyzer import weather_analyzer
+    if quantization not in ("dynamic", "int8"):
+        raise HTTPException(status_code=400, detail="quantization must be 'dynamic' or 'int8'")
+    try:
+        return {
+            "traffic": quantization_report(traffic_analyzer, quantization, sample_size),
+            "weather": quantization_report(weather_analyzer, quantization, sample_size)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/optimization/jobs")
+def submit_routing_job(request: RoutingRequest = None):
+    # Each job gets its own swarm state so concurrent jobs don't clobber each other
+    request = request or RoutingRequest()
+    optimizer = get_optimizer().clone()
+    try:
+        optimizer.get_time_context(request.start_time)  # bad start_time is a 400, not a failed job
+        job_id = job_manager.submit("routing", run_routing, request, optimizer)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/optimization/jobs/{job_id}")
+def get_routing_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job["history"] = [e.get("gbest_fitness", e.get("hypervolume")) for e in job.pop("events")]
+    return job
+
+@app.get("/optimization/jobs/{job_id}/stream")
+def stream_routing_job(job_id: str):
+    # Server-Sent Events: one "progress" event per iteration, then "done" / "failed" with the job
+    if job_manager.get(job_id, include_events=False) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    def events():
+        for event, payload in job_manager.stream(job_id):
+            if event == "ping":
+                yield ": ping\n\n"
+            else:
+                yield f"event: {event}\ndata: {json.dumps(jsonable_encoder(payload))}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+class CVRPRequest(BaseModel):
+    orders: list = None  # [{"order_id", "lat", "lon", "quantity_kg"}]; defaults to the agri demand dataset
+    n_orders: int = None
+    n_vehicles: int = 7
+    service_area: str = None
+    latency_ms: float = None
+
+@app.post("/optimization/run_cvrp")
+def run_cvrp_optimization(request: CVRPRequest = None):
+    try:
+        import pandas as pd
+        from models.optimization.cvrp import IQPSO_CVRP, load_fleet, load_orders
+        request = request or CVRPRequest()
+        orders = pd.DataFrame(request.orders) if request.orders else load_orders(n_orders=request.n_orders)
+        fleet = load_fleet(request.n_vehicles, request.service_area)
+        optimizer = IQPSO_CVRP(orders, fleet)
+        return optimizer.optimize(time_budget_ms=request.latency_ms)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+class LargeInstanceRequest(BaseModel):
+    orders: list = None  # [{"order_id", "lat", "lon", "place_name"?, "quantity_kg"?}]; defaults to the agri demand dataset
+    n_orders: int = None
+    geocode: bool = False  # look up dataset places missing from the coords cache
+    k_neighbors: int = 8
+    latency_ms: float = None
+    seed_solution: list = None
+
+@app.post("/optimization/run_large_instance")
+def run_large_instance_optimization(request: LargeInstanceRequest = None):
+    try:
+        import pandas as pd
+        from models.optimization.cvrp import load_orders
+        from models.optimization.large_instance import IQPSO_Large
+        request = request or LargeInstanceRequest()
+        if request.orders:
+            orders = pd.DataFrame(request.orders)
+        else:
+            orders = load_orders(n_orders=request.n_orders, geocode=request.geocode)
+        optimizer = IQPSO_Large(orders, k_neighbors=request.k_neighbors)
+        return optimizer.optimize(time_budget_ms=request.latency_ms, seed_solution=request.seed_solution)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+class PlanRequest(BaseModel):
+    vehicle_id: str
+    stops: list  # location names; the first one is where the vehicle currently is
+    start_time: str = None
+
+class VisitRequest(BaseModel):
+    location: str
+
+class OrderEvent(BaseModel):
+    vehicle_id: str
+    location: str
+
+class ConditionsEvent(BaseModel):
+    locations: list
+    reason: str = "traffic"  # "traffic" or "weather"
+
+@app.post("/rerouting/plans")
+def create_live_plan(request: PlanRequest):
+    try:
+        service = get_rerouting_service()
+        service.start()
+        return service.create_plan(request.vehicle_id, request.stops, request.start_time)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/rerouting/plans")
+def list_live_plans():
+    service = get_rerouting_service()
+    return {"plans": service.list_plans(), "stats": service.stats}
+
+@app.get("/rerouting/plans/{vehicle_id}")
+def get_live_plan(vehicle_id: str):
+    plan = get_rerouting_service().get_plan(vehicle_id)
+    if plan is None:
+        raise HTTPException(status_code=404, detail="Plan not found")
+    return plan
+
+@app.post("/rerouting/plans/{vehicle_id}/visited")
+def mark_stop_visited(vehicle_id: str, request: VisitRequest):
+    try:
+        return get_rerouting_service().mark_visited(vehicle_id, request.location)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Plan not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/rerouting/events/order")
+def report_new_order(request: OrderEvent):
+    try:
+        get_rerouting_service().add_order(request.vehicle_id, request.location)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Plan not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "queued"}
+
+@app.post("/rerouting/events/conditions")
+def report_conditions(request: ConditionsEvent):
+    get_rerouting_service().report_conditions(request.locations, request.reason)
+    return {"status": "queued"}
+
+startup_timing["import_s"] = round(time.perf_counter() - STARTED_AT, 3)
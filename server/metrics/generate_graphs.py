@@ -12,6 +12,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from models.traffic_analyzer import TrafficAnalyzer
 from models.optimization.iqpso_sa import IQPSO_SA
+from models.optimization.iqpso_pure import IQPSO_Pure
 from models.results_analyzer import COORDINATES_MAP
 
 METRICS_DIR = os.path.join(os.path.dirname(__file__))
@@ -72,39 +73,12 @@ def generate_lstm_graph():
     except Exception as e:
         print(f"Error generating LSTM graph: {e}")
 
-class IQPSO_Pure(IQPSO_SA):
-    def optimize(self):
-        self.initialize()
-        self.costs_cache = self.precompute_costs()
-        history = []
-        best_metrics_snapshot = {}
-        for it in range(1, self.max_iter + 1):
-            alpha = self.alpha_start - ((self.alpha_start - self.alpha_end) * (it / self.max_iter))
-            for i in range(self.num_particles):
-                fit, c, s, t = self.evaluate(self.particles[i])
-                if fit < self.pbest_fitness[i]:
-                    self.pbest[i] = self.particles[i].copy()
-                    self.pbest_fitness[i] = fit
-            min_idx = np.argmin(self.pbest_fitness)
-            if self.pbest_fitness[min_idx] < self.gbest_fitness:
-                self.gbest_fitness = self.pbest_fitness[min_idx]
-                self.gbest = self.pbest[min_idx].copy()
-                _, c, s, t = self.evaluate(self.gbest)
-                best_metrics_snapshot = {"cost": c, "sat": s, "time": t}
-            mbest = np.mean(self.pbest, axis=0)
-            for i in range(self.num_particles):
-                phi = np.random.rand(self.dim)
-                p = (phi * self.pbest[i]) + ((1 - phi) * self.gbest)
-                u = np.random.rand(self.dim)
-                sign = np.where(np.random.rand(self.dim) > 0.5, 1, -1)
-                self.particles[i] = p + (sign * alpha * np.abs(mbest - self.particles[i]) * np.log(1 / u))
-            history.append(self.gbest_fitness)
-        return history, best_metrics_snapshot, self.gbest
-
 def generate_optimization_graphs_and_metrics():
     
     optimizer_iqpso = IQPSO_Pure(num_particles=20, max_iter=40)
-    hist_iqpso, metrics_iqpso, _ = optimizer_iqpso.optimize()
+    result_iqpso = optimizer_iqpso.optimize()
+    hist_iqpso = result_iqpso['convergence']
+    metrics_iqpso = {"cost": result_iqpso['distribution_cost'], "sat": result_iqpso['customer_satisfaction']}
     
     optimizer_hybrid = IQPSO_SA(num_particles=20, max_iter=40)
     result_hybrid = optimizer_hybrid.optimize()
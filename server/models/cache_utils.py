@@ -0,0 +1,120 @@
+import os
+import json
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def file_signature(*paths):
+    # (mtime, size) of each artifact; changes when a model is retrained or replaced
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+
+def file_hash(*paths):
+    # SHA-256 over the contents of the given files (dataset fingerprint for training runs)
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_cached_metrics(metrics_path, fingerprint, artifact_paths):
+    # Metrics saved by the last training run if it had this fingerprint and the artifacts it
+    # wrote are still the ones on disk (not replaced afterwards); otherwise None
+    try:
+        with open(metrics_path, "r") as f:
+            saved = json.load(f)
+        metrics_mtime = os.path.getmtime(metrics_path)
+        if any(os.path.getmtime(path) > metrics_mtime for path in artifact_paths):
+            return None
+    except (OSError, ValueError):
+        return None
+    if saved.get("fingerprint") != fingerprint:
+        return None
+    return saved.get("metrics")
+
+
+def save_cached_metrics(metrics_path, fingerprint, metrics):
+    # Written after the model and encoders so its mtime marks them as belonging to this run
+    tmp_path = metrics_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"fingerprint": fingerprint, "metrics": metrics, "trained_at": time.time()}, f, indent=2, default=float)
+    os.replace(tmp_path, metrics_path)
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with a per-entry time-to-live and hit/miss counters.
+    If watch_paths are given, the whole cache is flushed as soon as any of those files changes.
+    """
+    def __init__(self, max_size=256, ttl_seconds=300.0, watch_paths=()):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.watch_paths = tuple(watch_paths)
+        self.signature = file_signature(*self.watch_paths)
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.flushes = 0
+
+    def check_artifacts(self):
+        # Caller holds the lock
+        if not self.watch_paths:
+            return
+        signature = file_signature(*self.watch_paths)
+        if signature != self.signature:
+            self.signature = signature
+            self.data.clear()
+            self.flushes += 1
+
+    def get(self, key, default=None):
+        with self.lock:
+            self.check_artifacts()
+            entry = self.data.get(key)
+            if entry is None or (time.monotonic() - entry[0]) > self.ttl_seconds:
+                if entry is not None:
+                    del self.data[key]
+                self.misses += 1
+                return default
+            self.data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self.lock:
+            self.check_artifacts()
+            self.data[key] = (time.monotonic(), value)
+            self.data.move_to_end(key)
+            while len(self.data) > self.max_size:
+                self.data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self.data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "flushes": self.flushes
+            }
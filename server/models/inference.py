@@ -0,0 +1,419 @@
+import os
+import json
+import time
+import threading
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Inference backends for the saved LSTMs:
+#   "keras" - tf.keras model.predict (imports TensorFlow)
+#   "numpy" - weights exported to .npz and a pure NumPy forward pass (no TensorFlow at serve time)
+#   "tflite" - quantized TFLite model on the TFLite interpreter; TFLITE_QUANTIZATION picks
+#              "dynamic" (int8 weights, float activations) or "int8" (calibrated int8 activations)
+# Chosen with the INFERENCE_BACKEND environment variable (or server/.env).
+
+DEFAULT_BACKEND = "numpy"
+DEFAULT_QUANTIZATION = "dynamic"
+
+def get_backend():
+    return os.getenv("INFERENCE_BACKEND", DEFAULT_BACKEND).lower()
+
+def get_quantization():
+    return os.getenv("TFLITE_QUANTIZATION", DEFAULT_QUANTIZATION).lower()
+
+def npz_path_for(model_path):
+    return os.path.splitext(model_path)[0] + ".npz"
+
+def tflite_path_for(model_path, quantization):
+    return f"{os.path.splitext(model_path)[0]}_{quantization}.tflite"
+
+def source_path_for(tflite_path):
+    return tflite_path + ".source"
+
+def export_source(artifact_path):
+    # SHA-256 of the .keras file an export was made from: stored inside an .npz, next to a .tflite.
+    # None for exports that did not record it
+    try:
+        if artifact_path.endswith(".npz"):
+            with np.load(artifact_path) as data:
+                return str(data["source"]) if "source" in data.files else None
+        with open(source_path_for(artifact_path)) as f:
+            return f.read().strip()
+    except (OSError, ValueError):
+        return None
+
+def is_stale(artifact_path, model_path):
+    # By content, not mtime: a checkout or copy does not preserve mtimes, so an older export can
+    # look newer than the model it was not made from
+    from models.cache_utils import file_hash
+    return not os.path.exists(artifact_path) or export_source(artifact_path) != file_hash(model_path)
+
+def export_npz(model_path, npz_path=None, model=None):
+    """
+    Pull the weights of a Sequential LSTM/Dense/Dropout model into an .npz next to it.
+    A JSON 'spec' entry records the layer order, kinds and activations, 'source' the hash of
+    model_path (which must hold the same model when one is passed in).
+    """
+    from models.cache_utils import file_hash
+    if model is None:
+        import tensorflow as tf
+        model = tf.keras.models.load_model(model_path)
+    npz_path = npz_path or npz_path_for(model_path)
+
+    spec, arrays = [], {}
+    for i, layer in enumerate(model.layers):
+        kind = type(layer).__name__
+        config = layer.get_config()
+        if kind == "LSTM":
+            kernel, recurrent, bias = layer.get_weights()
+            arrays[f"{i}_kernel"], arrays[f"{i}_recurrent"], arrays[f"{i}_bias"] = kernel, recurrent, bias
+            spec.append({
+                "kind": "LSTM", "index": i, "units": config["units"],
+                "activation": config.get("activation", "tanh"),
+                "recurrent_activation": config.get("recurrent_activation", "sigmoid"),
+                "return_sequences": config.get("return_sequences", False)
+            })
+        elif kind == "Dense":
+            kernel, bias = layer.get_weights()
+            arrays[f"{i}_kernel"], arrays[f"{i}_bias"] = kernel, bias
+            spec.append({"kind": "Dense", "index": i, "activation": config.get("activation", "linear")})
+        elif kind in ("Dropout", "InputLayer"):
+            continue  # identity at inference
+        else:
+            raise ValueError(f"Unsupported layer {kind} for NumPy export")
+
+    # Written to a temp file and swapped in, so a concurrent reader never loads a partial export
+    tmp_path = npz_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, spec=np.array(json.dumps(spec)), source=np.array(file_hash(model_path)), **arrays)
+    os.replace(tmp_path, npz_path)
+    return npz_path
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "tanh": np.tanh,
+    "sigmoid": lambda x: 0.5 * (1.0 + np.tanh(0.5 * x)),  # overflow-free form of 1 / (1 + e^-x)
+    "hard_sigmoid": lambda x: np.clip(0.2 * x + 0.5, 0.0, 1.0),
+}
+
+def export_tflite(model_path, tflite_path=None, quantization="dynamic", calibration=None, model=None):
+    """
+    Convert a saved LSTM to TFLite. "dynamic" quantizes the weights to int8; "int8" also
+    quantizes activations using calibration, an (n, timesteps, features) array of scaled
+    inputs (inputs and outputs stay float32 so callers are unchanged).
+    The LSTMs are rebuilt with unroll=True first: the looped Keras 3 LSTM lowers to resource
+    variables the interpreter cannot run, the unrolled one to plain builtin ops.
+    """
+    import tensorflow as tf
+    from models.cache_utils import file_hash
+    if model is None:
+        model = tf.keras.models.load_model(model_path)
+    tflite_path = tflite_path or tflite_path_for(model_path, quantization)
+
+    config = model.get_config()
+    for layer in config["layers"]:
+        if layer["class_name"] == "LSTM":
+            layer["config"]["unroll"] = True
+    unrolled = tf.keras.Sequential.from_config(config)
+    unrolled.set_weights(model.get_weights())
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(unrolled)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == "int8":
+        if calibration is None:
+            raise ValueError("int8 quantization needs a calibration sample")
+        samples = np.asarray(calibration, dtype=np.float32)
+
+        def representative_dataset():
+            for row in samples:
+                yield [row[None]]
+        converter.representative_dataset = representative_dataset
+    elif quantization != "dynamic":
+        raise ValueError(f"Unknown quantization {quantization}")
+
+    # Swapped in whole; the .source file written after it records which model it came from
+    tmp_path = tflite_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(converter.convert())
+    os.replace(tmp_path, tflite_path)
+    with open(source_path_for(tflite_path), "w") as f:
+        f.write(file_hash(model_path))
+    return tflite_path
+
+def tflite_interpreter(tflite_path):
+    # Prefer the standalone runtimes (no TensorFlow in the worker), else TensorFlow's own
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+    return Interpreter(model_path=tflite_path)
+
+class TFLiteLSTM:
+    """
+    TFLite interpreter with a Keras-style predict(). The input is resized to each batch size
+    (tensors are only reallocated when it changes); calls are serialized because an
+    interpreter must not be invoked from two threads at once.
+    """
+    def __init__(self, tflite_path):
+        self.path = tflite_path
+        self.interpreter = tflite_interpreter(tflite_path)
+        self.input_index = self.interpreter.get_input_details()[0]["index"]
+        self.output_index = self.interpreter.get_output_details()[0]["index"]
+        self.batch_shape = None
+        self.lock = threading.Lock()
+
+    def predict(self, x, verbose=0, **kwargs):
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim == 2:
+            x = x[:, None, :]
+        with self.lock:
+            if x.shape != self.batch_shape:
+                self.interpreter.resize_tensor_input(self.input_index, list(x.shape))
+                self.interpreter.allocate_tensors()
+                self.batch_shape = x.shape
+            self.interpreter.set_tensor(self.input_index, x)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self.output_index).copy()
+
+class NumpyLSTM:
+    """
+    Batched NumPy forward pass over exported weights. Matches Keras within float32 tolerance.
+    Inputs are (n, timesteps, features); states start at zero like Keras, so with the single
+    timestep these models use, each LSTM is one matmul (the recurrent and forget terms vanish).
+    predict(x, verbose=0) mirrors the Keras signature so analyzers can swap it in.
+    """
+    def __init__(self, npz_path):
+        data = np.load(npz_path)
+        self.spec = json.loads(str(data["spec"]))
+        self.weights = {k: data[k].astype(np.float32) for k in data.files if k not in ("spec", "source")}
+
+    def lstm(self, x, layer):
+        i = layer["index"]
+        kernel, recurrent, bias = self.weights[f"{i}_kernel"], self.weights[f"{i}_recurrent"], self.weights[f"{i}_bias"]
+        act, rec_act = ACTIVATIONS[layer["activation"]], ACTIVATIONS[layer["recurrent_activation"]]
+        n, steps, _ = x.shape
+        units = layer["units"]
+
+        # Input projection for every timestep at once; gates are ordered i, f, c, o
+        z_all = x @ kernel + bias
+        h = np.zeros((n, units), dtype=np.float32)
+        c = np.zeros((n, units), dtype=np.float32)
+        outputs = []
+        for t in range(steps):
+            z = z_all[:, t] if t == 0 else z_all[:, t] + h @ recurrent
+            gate_i = rec_act(z[:, :units])
+            gate_c = act(z[:, 2 * units:3 * units])
+            gate_o = rec_act(z[:, 3 * units:])
+            c = gate_i * gate_c if t == 0 else rec_act(z[:, units:2 * units]) * c + gate_i * gate_c
+            h = gate_o * act(c)
+            outputs.append(h)
+        return np.stack(outputs, axis=1) if layer["return_sequences"] else h
+
+    def predict(self, x, verbose=0, **kwargs):
+        out = np.asarray(x, dtype=np.float32)
+        if out.ndim == 2:
+            out = out[:, None, :]
+        for layer in self.spec:
+            if layer["kind"] == "LSTM":
+                out = self.lstm(out, layer)
+            else:
+                i = layer["index"]
+                out = ACTIVATIONS[layer["activation"]](out @ self.weights[f"{i}_kernel"] + self.weights[f"{i}_bias"])
+        return out
+
+def load_model(model_path, backend=None, calibration=None):
+    """
+    Model object with a Keras-style predict() for the configured backend. The numpy and tflite
+    backends (re-)export their artifact when it is missing or was made from a different .keras file; that
+    one-off export is the only time TensorFlow gets imported. calibration is a callable returning
+    the int8 calibration sample, only invoked when an int8 export is needed.
+    """
+    backend = backend or get_backend()
+    if backend == "numpy":
+        npz_path = npz_path_for(model_path)
+        if is_stale(npz_path, model_path):
+            print(f"Exporting {model_path} to {npz_path} for NumPy inference...")
+            export_npz(model_path, npz_path)
+        return NumpyLSTM(npz_path)
+    if backend == "tflite":
+        quantization = get_quantization()
+        tflite_path = tflite_path_for(model_path, quantization)
+        if is_stale(tflite_path, model_path):
+            print(f"Exporting {model_path} to {tflite_path} ({quantization} quantization)...")
+            sample = calibration() if (quantization == "int8" and calibration is not None) else None
+            export_tflite(model_path, tflite_path, quantization, sample)
+        return TFLiteLSTM(tflite_path)
+    if backend == "keras":
+        import tensorflow as tf
+        return tf.keras.models.load_model(model_path)
+    raise ValueError(f"Unknown inference backend {backend}")
+
+def rss_bytes():
+    # Resident set size of this process (Linux /proc; peak RSS elsewhere)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def model_size_bytes(model):
+    if isinstance(model, NumpyLSTM):
+        return sum(w.nbytes for w in model.weights.values())
+    if isinstance(model, TFLiteLSTM):
+        return os.path.getsize(model.path)
+    return int(model.count_params()) * 4
+
+class ModelHolder:
+    """
+    Owns one saved model and its joblib encoders/scalers. get() loads them once behind a lock
+    (concurrent first callers wait for the same load instead of each loading a copy), runs a
+    warm-up batch so graph tracing / tensor allocation is not paid by the first request, and
+    reloads when either file on disk changes. get() returns one dict (model, encoders, scaler_X,
+    scaler_y, features) so a caller never mixes a new model with old scalers mid-reload.
+    calibration(saved) returns the int8 calibration sample, only needed for int8 TFLite exports.
+    """
+    def __init__(self, model_path, encoders_path, backend=None, calibration=None, warmup_rows=8):
+        from models.cache_utils import file_signature
+        self.file_signature = file_signature
+        self.model_path = model_path
+        self.encoders_path = encoders_path
+        self.backend = backend or get_backend()
+        self.calibration = calibration
+        self.warmup_rows = warmup_rows
+        self.lock = threading.Lock()
+        self.artifacts = None
+        self.signature = None
+        self.loads = 0
+        self.load_stats = {}
+
+    def get(self):
+        artifacts = self.artifacts
+        if artifacts is not None and self.file_signature(self.model_path, self.encoders_path) == self.signature:
+            return artifacts
+        with self.lock:
+            signature = self.file_signature(self.model_path, self.encoders_path)
+            if self.artifacts is None or signature != self.signature:
+                self.load(signature)
+            return self.artifacts
+
+    def load(self, signature):
+        import joblib
+        rss_before = rss_bytes()
+        start = time.perf_counter()
+
+        saved = joblib.load(self.encoders_path)
+        calibration = None
+        if self.calibration is not None:
+            calibration = lambda: self.calibration(saved)
+        model = load_model(self.model_path, self.backend, calibration=calibration)
+        loaded = time.perf_counter()
+
+        # Warm-up batch: traces the Keras predict function / sizes the TFLite tensors
+        n_features = saved['scaler_X'].n_features_in_
+        model.predict(np.zeros((self.warmup_rows, 1, n_features), dtype=np.float32), verbose=0)
+        done = time.perf_counter()
+
+        self.artifacts = {
+            "model": model,
+            "encoders": saved['encoders'],
+            "scaler_X": saved['scaler_X'],
+            "scaler_y": saved['scaler_y'],
+            "features": saved.get('features')
+        }
+        self.signature = signature
+        self.loads += 1
+        self.load_stats = {
+            "load_seconds": round(loaded - start, 4),
+            "warmup_seconds": round(done - loaded, 4),
+            "model_bytes": model_size_bytes(model),
+            "rss_delta_mb": round((rss_bytes() - rss_before) / 2 ** 20, 2),
+            "loaded_at": time.time()
+        }
+        print(f"Loaded {self.model_path} ({self.backend}) in {done - start:.3f}s")
+
+    def stats(self):
+        return {
+            "model_path": self.model_path,
+            "backend": self.backend,
+            "loaded": self.artifacts is not None,
+            "loads": self.loads,
+            "rss_mb": round(rss_bytes() / 2 ** 20, 2),
+            **self.load_stats
+        }
+
+def single_row_latency_us(model, x, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        model.predict(x[:1], verbose=0)
+    return round((time.perf_counter() - start) / repeats * 1e6, 1)
+
+def quantization_report(analyzer, quantization="dynamic", sample_size=500):
+    """
+    Export the analyzer's model to TFLite (int8 calibrated on sample_size dataset rows) and
+    compare it with the Keras model on the train_model hold-out split: the same classification
+    metrics, their deltas, the largest output difference, file sizes and single-row latency.
+    """
+    artifacts = analyzer.load_artifacts()
+    scaler_y = artifacts['scaler_y']
+    tflite_path = export_tflite(analyzer.model_path, quantization=quantization,
+                                calibration=analyzer.calibration_sample(sample_size, artifacts=artifacts))
+    X_test, y_test = analyzer.evaluation_split(artifacts)
+
+    keras_model = load_model(analyzer.model_path, "keras")
+    tflite_model = TFLiteLSTM(tflite_path)
+    keras_pred = keras_model.predict(X_test, verbose=0)
+    tflite_pred = tflite_model.predict(X_test)
+
+    reference = analyzer.classification_metrics(keras_pred, y_test, scaler_y)
+    quantized = analyzer.classification_metrics(tflite_pred, y_test, scaler_y)
+    output_diff = np.abs(scaler_y.inverse_transform(tflite_pred) - scaler_y.inverse_transform(keras_pred))
+
+    return {
+        "model": analyzer.model_path,
+        "quantization": quantization,
+        "test_rows": len(X_test),
+        "keras": reference,
+        "tflite": quantized,
+        "delta": {k: round(quantized[k] - reference[k], 6) for k in ("accuracy", "precision", "recall", "f1_score")},
+        "max_abs_output_diff": output_diff.max(axis=0).round(6).tolist(),
+        "size_bytes": {"keras": os.path.getsize(analyzer.model_path), "tflite": os.path.getsize(tflite_path)},
+        "single_row_latency_us": {
+            "keras": single_row_latency_us(keras_model, X_test, 20),
+            "tflite": single_row_latency_us(tflite_model, X_test, 2000)
+        }
+    }
+
+if __name__ == "__main__":
+    #   python -m models.inference export-npz [model.keras ...]
+    #   python -m models.inference report --quantization int8 --output report.json
+    import sys
+    import argparse
+    parser = argparse.ArgumentParser(description="Export the saved LSTMs for TensorFlow-free inference")
+    parser.add_argument("command", choices=["export-npz", "report"])
+    parser.add_argument("models", nargs="*")
+    parser.add_argument("--quantization", choices=["dynamic", "int8"], default=DEFAULT_QUANTIZATION)
+    parser.add_argument("--sample-size", type=int, default=500)
+    parser.add_argument("--output", default=None, help="JSON file to write (stdout if omitted)")
+    args = parser.parse_args()
+
+    if args.command == "export-npz":
+        for path in args.models or ["models/saved/traffic_lstm.keras", "models/saved/weather_lstm.keras"]:
+            print(f"Exported {export_npz(path)}")
+    else:
+        from models.traffic_analyzer import traffic_analyzer
+        from models.weather_analyzer import weather_analyzer
+        report = [quantization_report(a, args.quantization, args.sample_size) for a in (traffic_analyzer, weather_analyzer)]
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"Quantization report written to {args.output}")
+        else:
+            json.dump(report, sys.stdout, indent=2)
@@ -0,0 +1,110 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobManager:
+    """
+    Runs long tasks on a bounded worker pool and keeps their status, progress events and
+    results in memory. A task is called as fn(*args, progress=callback, **kwargs); every
+    callback(payload) is appended to the job's event list and wakes up stream readers.
+    """
+    def __init__(self, max_workers=2, max_pending=8, max_jobs=200):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.max_pending = max_pending
+        self.max_jobs = max_jobs
+        self.jobs = OrderedDict()
+        self.cond = threading.Condition()
+
+    def submit(self, kind, fn, *args, **kwargs):
+        with self.cond:
+            pending = sum(1 for j in self.jobs.values() if j["status"] in ("queued", "running"))
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"{pending} jobs already queued or running")
+
+            job_id = uuid.uuid4().hex
+            self.jobs[job_id] = {
+                "job_id": job_id,
+                "kind": kind,
+                "status": "queued",
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "events": [],
+                "result": None,
+                "error": None
+            }
+            self.evict()
+
+        self.executor.submit(self.run, job_id, fn, args, kwargs)
+        return job_id
+
+    def evict(self):
+        # Drop the oldest finished jobs once the table is full
+        finished = [k for k, j in self.jobs.items() if j["status"] in ("done", "failed")]
+        while len(self.jobs) > self.max_jobs and finished:
+            del self.jobs[finished.pop(0)]
+
+    def run(self, job_id, fn, args, kwargs):
+        self.update(job_id, status="running", started_at=time.time())
+
+        def progress(payload):
+            with self.cond:
+                self.jobs[job_id]["events"].append(payload)
+                self.cond.notify_all()
+
+        try:
+            result = fn(*args, progress=progress, **kwargs)
+            self.update(job_id, status="done", result=result, finished_at=time.time())
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            self.update(job_id, status="failed", error=str(e), finished_at=time.time())
+
+    def update(self, job_id, **fields):
+        with self.cond:
+            self.jobs[job_id].update(fields)
+            self.cond.notify_all()
+
+    def get(self, job_id, include_events=True):
+        with self.cond:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            job = dict(job)
+            job["events"] = list(job["events"]) if include_events else len(job["events"])
+            return job
+
+    def stream(self, job_id, timeout=15.0):
+        """
+        Yields ("progress", payload) for every event as it arrives, then ("done"/"failed", job)
+        once the job finishes. A ("ping", None) is yielded after timeout seconds of silence.
+        """
+        sent = 0
+        while True:
+            with self.cond:
+                job = self.jobs.get(job_id)
+                if job is None:
+                    return
+                if len(job["events"]) == sent and job["status"] in ("queued", "running"):
+                    self.cond.wait(timeout)
+                events = job["events"][sent:]
+                status = job["status"]
+            if not events and status in ("queued", "running"):
+                yield "ping", None
+            for payload in events:
+                yield "progress", payload
+            sent += len(events)
+            if status in ("done", "failed") and sent == len(job["events"]):
+                yield status, self.get(job_id, include_events=False)
+                return
+
+    def shutdown(self, wait=False):
+        # Drop queued jobs; running ones finish on their threads unless wait=False and the process exits
+        self.executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,235 @@
+import os
+import time
+import joblib
+from sklearn.preprocessing import MinMaxScaler, LabelEncoder
+from sklearn.model_selection import train_test_split
+from models.cache_utils import file_hash, load_cached_metrics, save_cached_metrics
+from models.inference import get_backend, export_npz, npz_path_for, ModelHolder
+from models.training_pipeline import features_path_for, configure_threads, cached_features, make_dataset, throughput_callback
+
+
+class LSTMAnalyzer:
+    """
+    Shared plumbing of the traffic and weather LSTM analyzers: artifact paths, the
+    ModelHolder that loads model + encoders once, switching the analyzer's encoders and
+    scalers to a loaded artifact set, and training (tf.data pipeline, progress events,
+    dataset-hash metrics cache). Subclasses set their columns and add load_data,
+    add_features, build_model, classification_metrics and their predict methods.
+    """
+    default_epochs = 20
+    categorical_columns = []  # label-encoded in this order
+    feature_columns = []
+    target_columns = []
+
+    def __init__(self, name, data_path):
+        self.name = name
+        self.data_path = data_path
+        self.model = None
+        self.scaler_X = MinMaxScaler()
+        self.scaler_y = MinMaxScaler()
+        self.label_encoders = {}
+        self.model_path = f'models/saved/{name}_lstm.keras'
+        self.encoders_path = f'models/saved/{name}_encoders.pkl'
+        self.metrics_path = f'models/saved/{name}_metrics.json'
+        self.features_path = features_path_for(self.model_path)  # preprocessed training data cache
+        self.backend = get_backend()  # INFERENCE_BACKEND: numpy (default), tflite or keras
+        # Loads model + encoders once (thread-safe, with a warm-up batch); artifacts is the set in use
+        self.holder = ModelHolder(self.model_path, self.encoders_path, self.backend, calibration=self.calibration_from)
+        self.artifacts = None
+
+        os.makedirs('models/saved', exist_ok=True)
+
+    def add_features(self, df):
+        # Derived columns preprocess needs beyond the CSV ones
+        pass
+
+    def encode_frame(self, df, artifacts=None):
+        """
+        Scaled LSTM inputs and targets for df. With artifacts=None new encoders and scalers are
+        fitted; otherwise the given set ({'encoders', 'scaler_X', 'scaler_y'}) is applied.
+        Never reads or writes the analyzer's own encoders, which may be serving predictions.
+        Returns X, y, features and the encoders/scalers used.
+        """
+        fit = artifacts is None
+        if fit:
+            artifacts = {'encoders': {}, 'scaler_X': MinMaxScaler(), 'scaler_y': MinMaxScaler()}
+        encoders = artifacts['encoders']
+        self.add_features(df)
+
+        # Encode categorical variables
+        for col in self.categorical_columns:
+            if fit:
+                le = LabelEncoder()
+                df[col] = le.fit_transform(df[col])
+                encoders[col] = le
+            else:
+                df[col] = encoders[col].transform(df[col])
+
+        features = list(self.feature_columns)
+        X = df[features].values
+        y = df[self.target_columns].values
+
+        # Scale data
+        if fit:
+            X_scaled = artifacts['scaler_X'].fit_transform(X)
+            y_scaled = artifacts['scaler_y'].fit_transform(y)
+        else:
+            X_scaled = artifacts['scaler_X'].transform(X)
+            y_scaled = artifacts['scaler_y'].transform(y)
+
+        # Reshape for LSTM [samples, time steps, features]
+        X_reshaped = X_scaled.reshape((X_scaled.shape[0], 1, X_scaled.shape[1]))
+
+        return X_reshaped, y_scaled, features, artifacts
+
+    def preprocess(self, df, fit=True):
+        # Script entry point: fit=True keeps the fitted encoders/scalers on the analyzer,
+        # fit=False reuses them. Training and serving go through encode_frame instead
+        if fit:
+            X, y, features, fitted = self.encode_frame(df)
+            self.use_artifacts(fitted)
+            return X, y, features
+        X, y, features, _ = self.encode_frame(df, {'encoders': self.label_encoders, 'scaler_X': self.scaler_X,
+                                                   'scaler_y': self.scaler_y})
+        return X, y, features
+
+    def training_features(self, dataset_hash):
+        # load_data + encode_frame, or their saved output when the dataset is unchanged.
+        # Returns the data dict (X, y, features, encoders, scaler_X, scaler_y) and whether it was cached
+        def build():
+            X, y, feature_names, fitted = self.encode_frame(self.load_data())
+            return {'X': X, 'y': y, 'features': feature_names, **fitted}
+        return cached_features(self.features_path, dataset_hash, build)
+
+    def train_model(self, epochs=None, batch_size=32, progress=None):
+        # progress(payload) is called after every epoch (JobManager progress events).
+        # The model, encoders and scalers stay local until they are saved: requests served
+        # meanwhile reload the analyzer's own set from disk and must not leak into this run
+        epochs = epochs or self.default_epochs
+        fingerprint = self.training_fingerprint(epochs, batch_size)
+        threads = configure_threads()
+        print(f"Loading and preprocessing {self.name} data...")
+        start = time.perf_counter()
+        data, cache_hit = self.training_features(fingerprint["dataset_hash"])
+        X, y = data['X'], data['y']
+        preprocess_seconds = time.perf_counter() - start
+        
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        train_data = make_dataset(X_train, y_train, batch_size, shuffle=True)
+        val_data = make_dataset(X_test, y_test, batch_size)
+        
+        print(f"Building {self.name} LSTM model with input shape {X.shape[1:]}...")
+        model = self.build_model(X.shape[1:])
+        
+        throughput = throughput_callback(len(X_train))
+        callbacks = [throughput]
+        if progress is not None:
+            from tensorflow.keras.callbacks import LambdaCallback
+            callbacks.append(LambdaCallback(on_epoch_end=lambda epoch, logs: progress({
+                "epoch": epoch + 1, "epochs": epochs,
+                "loss": float(logs.get("loss", 0.0)), "val_loss": float(logs.get("val_loss", 0.0))
+            })))
+        
+        print("Training model...")
+        history = model.fit(
+            train_data,
+            epochs=epochs,
+            validation_data=val_data,
+            callbacks=callbacks,
+            verbose=1
+        )
+        y_pred = model.predict(X_test)
+        
+        self.save_artifacts(model, {
+            'scaler_X': data['scaler_X'],
+            'scaler_y': data['scaler_y'],
+            'encoders': data['encoders'],
+            'features': data['features']
+        })
+        
+        print(f"{self.name.capitalize()} model training complete and saved.")
+        
+        # Return metrics
+        loss = history.history['loss'][-1]
+        val_loss = history.history['val_loss'][-1]
+        
+        metrics = {
+            "status": "success",
+            "training_loss": loss,
+            "validation_loss": val_loss,
+            "mean_absolute_error": history.history['mae'][-1],
+            "val_mean_absolute_error": history.history['val_mae'][-1],
+            "epochs": epochs,
+            "classification_metrics": self.classification_metrics(y_pred, y_test, data['scaler_y']),
+            "throughput": {
+                **throughput.report(),
+                "preprocess_seconds": round(preprocess_seconds, 3),
+                "feature_cache": "hit" if cache_hit else "miss",
+                "threads": threads
+            }
+        }
+        print(f"Training throughput: {metrics['throughput']['samples_per_sec']} samples/sec")
+        save_cached_metrics(self.metrics_path, fingerprint, metrics)
+        return metrics
+
+    def save_artifacts(self, model, saved):
+        # Everything is written to temp files first, then swapped in under the holder lock so a
+        # reload never pairs the new model with the old encoders, and no serving thread exports
+        # the .npz while it is being replaced. The .npz goes in before the .keras it was made from
+        root = os.path.splitext(self.model_path)[0]
+        model_tmp, npz_tmp, encoders_tmp = root + ".tmp.keras", root + ".tmp.npz", self.encoders_path + ".tmp"
+        model.save(model_tmp)
+        export_npz(model_tmp, npz_tmp, model=model)
+        joblib.dump(saved, encoders_tmp)
+        with self.holder.lock:
+            os.replace(encoders_tmp, self.encoders_path)
+            os.replace(npz_tmp, npz_path_for(self.model_path))
+            os.replace(model_tmp, self.model_path)
+
+    def dataset_paths(self):
+        # Files whose contents the trained model depends on (training fingerprint)
+        return [self.data_path]
+
+    def training_fingerprint(self, epochs, batch_size):
+        # Dataset contents + hyperparameters; a match means retraining would repeat the saved run
+        return {"dataset_hash": file_hash(*self.dataset_paths()), "epochs": epochs, "batch_size": batch_size}
+
+    def cached_metrics(self, epochs=None, batch_size=32):
+        # Metrics of the saved model when it was trained on the current dataset with these settings
+        try:
+            fingerprint = self.training_fingerprint(epochs or self.default_epochs, batch_size)
+        except OSError:
+            return None
+        return load_cached_metrics(self.metrics_path, fingerprint, (self.model_path, self.encoders_path))
+
+    def evaluation_split(self, artifacts=None):
+        # The hold-out split train_model scores on, encoded with artifacts (default: the saved set)
+        X, y, _, _ = self.encode_frame(self.load_data(), artifacts or self.load_artifacts())
+        _, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        return X_test, y_test
+
+    def calibration_sample(self, size=500, seed=42, artifacts=None):
+        # Scaled model inputs for a random sample of the training dataset (int8 calibration)
+        df = self.load_data()
+        df = df.sample(n=min(size, len(df)), random_state=seed)
+        X, _, _, _ = self.encode_frame(df, artifacts or self.load_artifacts())
+        return X
+
+    def load_artifacts(self):
+        # The holder reloads everything if the saved model was retrained or replaced since we loaded it
+        artifacts = self.holder.get()
+        if artifacts is not self.artifacts:
+            self.use_artifacts(artifacts)
+            self.artifacts = artifacts
+        return artifacts
+
+    def use_artifacts(self, saved):
+        self.label_encoders = saved['encoders']
+        self.scaler_X = saved['scaler_X']
+        self.scaler_y = saved['scaler_y']
+        if 'model' in saved:
+            self.model = saved['model']
+
+    def calibration_from(self, saved):
+        # int8 TFLite export during a holder load: encode the sample with the artifacts being loaded
+        return self.calibration_sample(artifacts=saved)
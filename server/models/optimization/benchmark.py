@@ -0,0 +1,213 @@
+import os
+import sys
+import json
+import time
+import platform
+import tracemalloc
+import numpy as np
+import pandas as pd
+from models.optimization.iqpso_sa import IQPSO_SA
+from models.optimization.iqpso_pure import IQPSO_Pure
+from models.optimization.cvrp import IQPSO_CVRP
+from models.optimization.instances import load_instance, list_instances
+
+# Optimizer benchmark on TSPLIB / CVRPLIB instance files:
+#   python -m models.optimization.benchmark <instance_dir> --trials 5 --output bench.json
+# Reports per instance and algorithm the best/mean gap to the known optimum, time-to-target,
+# evaluations per second and peak traced memory, as JSON for regression tracking.
+
+ALGORITHMS = {"IQPSO_SA": IQPSO_SA, "IQPSO_Pure": IQPSO_Pure}
+
+class MatrixTSP:
+    """
+    Closed-tour objective over an instance distance matrix, mixed in front of an optimizer
+    class (IQPSO_SA / IQPSO_Pure) so the swarm logic under test is untouched.
+    """
+    def load_instance(self, instance):
+        self.matrix = instance["matrix"]
+        self.locations = [str(i + 1) for i in range(instance["dimension"])]
+        self.dim = len(self.locations)
+        self.num_legs = self.dim
+        self.fixed_first = None
+        self.w1, self.w2 = 1.0, 0.0
+        # Scale by the identity tour so objectives sit near 0..1
+        self.max_cost = float(self.matrix[np.arange(self.dim), np.roll(np.arange(self.dim), -1)].sum()) or 1.0
+        self.evaluations = 0
+
+    def prepare(self, start_time=None):
+        self.leg_cost = self.matrix
+
+    def tour_length(self, perms):
+        return self.matrix[perms, np.roll(perms, -1, axis=1)].sum(axis=1)
+
+    def evaluate_batch(self, positions):
+        self.evaluations += len(positions)
+        length = self.tour_length(np.argsort(positions, axis=1))
+        return length / self.max_cost, length, np.zeros(len(positions)), length
+
+    def get_leg_weights(self):
+        # Open-route local search; refine_gbest re-checks the closed tour before accepting
+        return self.matrix / self.max_cost
+
+class MatrixCVRP(IQPSO_CVRP):
+    # CVRPLIB instance on the giant-tour + Split optimizer; cost = distance only, as in CVRPLIB
+    def __init__(self, instance, num_particles=30, max_iter=100):
+        depot = instance["depot"]
+        customers = np.array([i for i in range(instance["dimension"]) if i != depot])
+        # Node coordinates (if any) only feed the sweep seeds; distances come from the matrix
+        coords = instance["coords"] if instance["coords"] is not None else np.zeros((instance["dimension"], 2))
+        orders = pd.DataFrame({
+            "order_id": customers + 1,
+            "lat": coords[customers, 1],
+            "lon": coords[customers, 0],
+            "quantity_kg": instance["demands"][customers]
+        })
+        n_vehicles = instance["vehicles"] or len(customers)
+        fleet = pd.DataFrame({
+            "vehicle_id": [f"V{k + 1}" for k in range(n_vehicles)],
+            "max_load_kg": [instance["capacity"]] * n_vehicles
+        })
+        super().__init__(orders, fleet, depot={"lat": coords[depot, 1], "lon": coords[depot, 0]},
+                         num_particles=num_particles, max_iter=max_iter)
+
+        self.customer_matrix = instance["matrix"][np.ix_(customers, customers)]
+        self.depot_km = instance["matrix"][depot, customers]
+        self.cost_per_km = 1.0
+        self.fixed_vehicle_cost = 0.0
+        self.max_cost = 2 * self.depot_km.sum()
+        self.evaluations = 0
+
+    def leg_km(self, frm, to):
+        return self.customer_matrix[frm, to]
+
+    def evaluate_batch(self, positions):
+        self.evaluations += len(positions)
+        return super().evaluate_batch(positions)
+
+def build_optimizer(algorithm, instance, num_particles, max_iter):
+    if instance["type"] == "CVRP":
+        if algorithm != "IQPSO_SA":
+            return None
+        return MatrixCVRP(instance, num_particles=num_particles, max_iter=max_iter)
+    cls = ALGORITHMS[algorithm]
+    optimizer = type(f"{algorithm}_TSP", (MatrixTSP, cls), {})(num_particles=num_particles, max_iter=max_iter)
+    optimizer.load_instance(instance)
+    return optimizer
+
+def run_trial(optimizer, seed, optimum, target_gap, time_budget_ms=None):
+    # One seeded search; the objective is tracked per iteration to find the time-to-target.
+    # tracemalloc slows the search ~3x, so the timed run is untraced and peak memory comes
+    # from a second, untimed run with the same seed
+    target = optimum * (1.0 + target_gap) if optimum else None
+    trace = []
+
+    def on_iteration(it, fitness):
+        trace.append(((time.perf_counter() - start) * 1000.0, float(fitness) * optimizer.max_cost))
+
+    optimizer.evaluations = 0
+    start = time.perf_counter()
+    run = optimizer.search(np.random.default_rng(seed), time_budget_ms=time_budget_ms, on_iteration=on_iteration)
+    evaluations = optimizer.evaluations
+
+    tracemalloc.start()
+    try:
+        optimizer.search(np.random.default_rng(seed), time_budget_ms=time_budget_ms)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best = float(run["gbest_fitness"]) * optimizer.max_cost
+    elapsed_ms = run["elapsed_ms"]
+    time_to_target = None
+    if target is not None:
+        time_to_target = next((t for t, value in trace if value <= target + 1e-9), None)
+    return {
+        "best": round(best, 4),
+        "gap": round((best - optimum) / optimum, 6) if optimum else None,
+        "time_to_target_ms": round(time_to_target, 3) if time_to_target is not None else None,
+        "elapsed_ms": round(elapsed_ms, 3),
+        "iterations": len(run["history"]),
+        "stop_reason": run["stop_reason"],
+        "evaluations": evaluations,
+        "evals_per_sec": round(evaluations / (elapsed_ms / 1000.0), 1) if elapsed_ms > 0 else None,
+        "peak_memory_mb": round(peak / 2 ** 20, 3)
+    }
+
+def summarize(trials):
+    gaps = [t["gap"] for t in trials if t["gap"] is not None]
+    hits = [t["time_to_target_ms"] for t in trials if t["time_to_target_ms"] is not None]
+    return {
+        "best": min(t["best"] for t in trials),
+        "best_gap": min(gaps) if gaps else None,
+        "mean_gap": round(float(np.mean(gaps)), 6) if gaps else None,
+        "target_hit_rate": round(len(hits) / len(trials), 4),
+        "mean_time_to_target_ms": round(float(np.mean(hits)), 3) if hits else None,
+        "mean_elapsed_ms": round(float(np.mean([t["elapsed_ms"] for t in trials])), 3),
+        "evals_per_sec": round(float(np.mean([t["evals_per_sec"] or 0 for t in trials])), 1),
+        "peak_memory_mb": max(t["peak_memory_mb"] for t in trials)
+    }
+
+def run_benchmark(instance_dir, algorithms=("IQPSO_SA", "IQPSO_Pure"), trials=5, seed=0, num_particles=30,
+                  max_iter=100, time_budget_ms=None, target_gap=0.05):
+    """
+    Every instance file in instance_dir x every algorithm x `trials` seeded runs. Trial seeds are
+    spawned from one SeedSequence(seed) per instance, so both algorithms see the same seeds.
+    """
+    report = {
+        "config": {
+            "instance_dir": instance_dir, "algorithms": list(algorithms), "trials": trials, "seed": seed,
+            "num_particles": num_particles, "max_iter": max_iter, "time_budget_ms": time_budget_ms,
+            "target_gap": target_gap
+        },
+        "environment": {
+            "python": platform.python_version(), "numpy": np.__version__,
+            "platform": platform.platform(), "cpu_count": os.cpu_count()
+        },
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "instances": []
+    }
+
+    for path in list_instances(instance_dir):
+        try:
+            instance = load_instance(path)
+        except Exception as e:
+            print(f"Error loading instance {path}: {e}")
+            continue
+        print(f"Benchmarking {instance['name']} ({instance['type']}, n={instance['dimension']})...")
+
+        entry = {
+            "name": instance["name"], "type": instance["type"], "dimension": instance["dimension"],
+            "optimum": instance["optimum"], "algorithms": {}
+        }
+        seeds = np.random.SeedSequence(seed).spawn(trials)
+        for algorithm in algorithms:
+            optimizer = build_optimizer(algorithm, instance, num_particles, max_iter)
+            if optimizer is None:
+                continue
+            results = [run_trial(optimizer, s, instance["optimum"], target_gap, time_budget_ms) for s in seeds]
+            entry["algorithms"][algorithm] = {"summary": summarize(results), "trials": results}
+        report["instances"].append(entry)
+    return report
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark IQPSO variants on TSPLIB/CVRPLIB instances")
+    parser.add_argument("instance_dir")
+    parser.add_argument("--algorithms", nargs="+", default=["IQPSO_SA", "IQPSO_Pure"], choices=list(ALGORITHMS))
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--particles", type=int, default=30)
+    parser.add_argument("--max-iter", type=int, default=100)
+    parser.add_argument("--time-budget-ms", type=float, default=None)
+    parser.add_argument("--target-gap", type=float, default=0.05)
+    parser.add_argument("--output", default=None, help="JSON file to write (stdout if omitted)")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.instance_dir, args.algorithms, args.trials, args.seed, args.particles,
+                           args.max_iter, args.time_budget_ms, args.target_gap)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Benchmark report written to {args.output}")
+    else:
+        json.dump(report, sys.stdout, indent=2)
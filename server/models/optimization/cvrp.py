@@ -0,0 +1,284 @@
+import os
+import json
+from collections import deque
+import numpy as np
+import pandas as pd
+from models.optimization.iqpso_sa import IQPSO_SA, haversine_km
+from models.optimization.local_search import two_opt_cycle
+from models.results_analyzer import COORDINATES_MAP
+
+VEHICLE_DATA_PATH = 'models/data/data_sets/vehicle_data.csv'
+DEMAND_DATA_PATH = 'models/data/data_sets/hyderabad_agri_demand_dataset.csv'
+
+def resolve_path(path):
+    # Same fallback the rest of the server uses when started from the repo root
+    if not os.path.exists(path):
+        path = os.path.join('server', path)
+    return path
+
+def load_fleet(n_vehicles=None, service_area=None):
+    # Vehicle ids and capacities from vehicle_data.csv, optionally restricted to a service area
+    vdf = pd.read_csv(resolve_path(VEHICLE_DATA_PATH), usecols=['vehicle_id', 'max_load_kg', 'service_area'])
+    if service_area is not None:
+        vdf = vdf[vdf['service_area'] == service_area]
+    if n_vehicles is not None:
+        vdf = vdf.head(n_vehicles)
+    return vdf[['vehicle_id', 'max_load_kg']].reset_index(drop=True)
+
+def load_orders(path=DEMAND_DATA_PATH, n_orders=None, geocode=False):
+    # Orders from the agri demand dataset, placed with the cached geocodes.
+    # geocode=True looks up places missing from the cache first (network calls).
+    from models.hub_optimizer import CACHE_PATH, geocode_places
+    df = pd.read_csv(resolve_path(path))
+    if geocode:
+        coords = geocode_places(df["place_name"].unique())
+    else:
+        with open(CACHE_PATH, "r") as f:
+            coords = json.load(f)
+
+    df["lat"] = df["place_name"].map(lambda v: coords.get(v, (None, None))[0])
+    df["lon"] = df["place_name"].map(lambda v: coords.get(v, (None, None))[1])
+    df = df.dropna(subset=["lat", "lon"])
+    if n_orders is not None:
+        df = df.head(n_orders)
+    return df[["order_id", "place_name", "lat", "lon", "quantity_kg"]].reset_index(drop=True)
+
+def split_tour(loads, along, depot_km, capacity, route_cost_km=0.0):
+    """
+    Vidal's O(n) Split of one giant tour. Inputs are 1-indexed along the tour (index 0 = depot):
+    loads[k] cumulative demand, along[k] distance from stop 1 to stop k, depot_km[k] depot distance.
+    A route serving stops i+1..j costs depot_km[i+1] + along[j] - along[i+1] + depot_km[j], so
+    p[j] = min over feasible i of key[i] + along[j] + depot_km[j] with key[i] = p[i] + depot_km[i+1] - along[i+1],
+    a sliding-window minimum kept in a monotone deque. route_cost_km adds a fixed per-route
+    charge (in km-equivalents) so Split also trades off the number of vehicles.
+    """
+    n = len(loads) - 1
+    p = [0.0] * (n + 1)
+    key = [0.0] * (n + 1)
+    pred = [0] * (n + 1)
+    key[0] = depot_km[1] - along[1]
+    dq = deque([0])
+
+    for j in range(1, n + 1):
+        # Drop fronts whose route would exceed capacity (the newest candidate j-1 always fits)
+        load_j = loads[j]
+        while len(dq) > 1 and load_j - loads[dq[0]] > capacity:
+            dq.popleft()
+        front = dq[0]
+        p[j] = key[front] + along[j] + depot_km[j] + route_cost_km
+        pred[j] = front
+
+        if j < n:
+            key_j = p[j] + depot_km[j + 1] - along[j + 1]
+            key[j] = key_j
+            while dq and key[dq[-1]] >= key_j:
+                dq.pop()
+            dq.append(j)
+
+    return p[n], pred
+
+class IQPSO_CVRP(IQPSO_SA):
+    """
+    Capacitated multi-vehicle mode. Each particle encodes a giant tour over all orders
+    (SPV decode); the tour is cut into vehicle routes by the linear-time Split
+    (sliding-window minimum over a monotone deque).
+    Split uses a single capacity - the smallest max_load_kg in the fleet - so every
+    route fits every vehicle; routes beyond the fleet size are penalised.
+    The objective is cost only (distance + fixed per-vehicle cost).
+    Half the swarm starts from constructive giant tours (angular sweeps around the depot and
+    a nearest-neighbour tour), and gbest gets intra-route 2-opt every local_search_interval
+    iterations; random giant tours alone barely improve on random routes.
+    """
+    def __init__(self, orders, fleet, depot=None, num_particles=30, max_iter=100):
+        super().__init__(num_particles=num_particles, max_iter=max_iter)
+
+        self.orders = orders.reset_index(drop=True)
+        self.locations = self.orders["order_id"].tolist()
+        self.dim = len(self.locations)
+        self.lat = self.orders["lat"].to_numpy(dtype=float)
+        self.lon = self.orders["lon"].to_numpy(dtype=float)
+        self.demand = self.orders["quantity_kg"].to_numpy(dtype=float)
+
+        self.fleet = fleet.reset_index(drop=True)
+        self.capacity = float(self.fleet["max_load_kg"].min())
+        if self.demand.max() > self.capacity:
+            raise ValueError(f"Order of {self.demand.max()} kg exceeds vehicle capacity {self.capacity} kg")
+
+        depot = depot or COORDINATES_MAP["Mehdipatnam"]
+        self.depot = (depot["lat"], depot["lon"])
+        self.depot_km = haversine_km(self.depot[0], self.depot[1], self.lat, self.lon)
+
+        # Cost model
+        self.cost_per_km = 25.0         # fuel + running cost (INR/km)
+        self.fixed_vehicle_cost = 500.0 # per dispatched vehicle
+        self.extra_vehicle_penalty = 1e5
+        self.avg_speed_kmph = 30.0
+
+        # Upper-bound estimate: every order served by its own out-and-back trip
+        self.max_cost = (2 * self.depot_km.sum() * self.cost_per_km) + (self.fixed_vehicle_cost * self.dim)
+
+        # Seeded particles keep their tour up to a few swaps: noise of ~3 SPV rank steps
+        self.warm_start_sigma = 3 * 20.0 / max(self.dim - 1, 1)
+        # Rotations of the angular sweep used as seeds (different first route)
+        self.sweep_starts = 4
+        # Intra-route 2-opt on gbest (leg matrices are not used here)
+        self.local_search_interval = 10
+
+    def leg_km(self, frm, to):
+        # Distance between orders (index arrays of any shape)
+        return haversine_km(self.lat[frm], self.lon[frm], self.lat[to], self.lon[to])
+
+    def split(self, tours):
+        """
+        Linear Split for a batch of giant tours (num_particles, n).
+        Returns route distance totals (km), route counts and the predecessor lists for decoding.
+        """
+        P, n = tours.shape
+
+        # Position k (1..n) in the tour; index 0 is the depot. Built for the whole swarm at once.
+        loads = np.concatenate([np.zeros((P, 1)), np.cumsum(self.demand[tours], axis=1)], axis=1)
+        legs = self.leg_km(tours[:, :-1], tours[:, 1:])
+        # along[:, k] = distance from stop 1 to stop k along the tour
+        along = np.concatenate([np.zeros((P, 2)), np.cumsum(legs, axis=1)], axis=1)
+        depot_km = np.concatenate([np.zeros((P, 1)), self.depot_km[tours]], axis=1)
+
+        route_cost_km = self.fixed_vehicle_cost / self.cost_per_km
+        distance_km = np.zeros(P)
+        routes = np.zeros(P, dtype=int)
+        preds = []
+        for r in range(P):
+            total, pred = split_tour(loads[r].tolist(), along[r].tolist(), depot_km[r].tolist(),
+                                     self.capacity, route_cost_km)
+            j = n
+            while j > 0:
+                routes[r] += 1
+                j = pred[j]
+            distance_km[r] = total - (routes[r] * route_cost_km)
+            preds.append(pred)
+        return distance_km, routes, preds
+
+    def evaluate_batch(self, positions):
+        tours = np.argsort(positions, axis=1)
+        distance_km, routes, _ = self.split(tours)
+
+        total_cost = (distance_km * self.cost_per_km) + (routes * self.fixed_vehicle_cost)
+        penalty = np.maximum(routes - len(self.fleet), 0) * self.extra_vehicle_penalty
+        total_time = distance_km / self.avg_speed_kmph * 60.0
+        total_sat = np.zeros(len(positions))
+
+        objective = (total_cost + penalty) / self.max_cost
+        return objective, total_cost, total_sat, total_time
+
+    def sweep_tours(self):
+        # Orders by polar angle around the depot, started at sweep_starts evenly spaced angles
+        if np.ptp(self.lat) == 0 and np.ptp(self.lon) == 0:
+            return []  # no coordinates (matrix-only instance)
+        order = np.argsort(np.arctan2(self.lat - self.depot[0], self.lon - self.depot[1]))
+        step = max(self.dim // self.sweep_starts, 1)
+        return [np.roll(order, -k * step) for k in range(self.sweep_starts)]
+
+    def nearest_neighbour_tour(self):
+        # Greedy giant tour from the order closest to the depot
+        visited = np.zeros(self.dim, dtype=bool)
+        tour = [int(np.argmin(self.depot_km))]
+        visited[tour[0]] = True
+        for _ in range(self.dim - 1):
+            left = np.flatnonzero(~visited)
+            nxt = int(left[np.argmin(self.leg_km(np.full(len(left), tour[-1]), left))])
+            tour.append(nxt)
+            visited[nxt] = True
+        return np.asarray(tour)
+
+    def initialize(self, seed_position=None):
+        super().initialize(seed_position)
+        if seed_position is not None:
+            return
+        # Constructive seeds for warm_start_fraction of the swarm: each seed once as is, then
+        # noisy copies; the rest of the swarm stays uniform for diversity
+        ranks = np.linspace(-10, 10, self.dim)
+        seeds = []
+        for tour in self.sweep_tours() + [self.nearest_neighbour_tour()]:
+            position = np.empty(self.dim)
+            position[tour] = ranks
+            seeds.append(position)
+        n_seeded = max(len(seeds), int(self.num_particles * self.warm_start_fraction))
+        for k in range(min(n_seeded, self.num_particles)):
+            noise = self.rng.normal(0.0, self.warm_start_sigma, self.dim) if k >= len(seeds) else 0.0
+            self.particles[k] = seeds[k % len(seeds)] + noise
+        self.pbest = np.copy(self.particles)
+
+    def route_stops(self, tour):
+        # Split the giant tour into vehicle routes (arrays of order indices)
+        _, _, preds = self.split(tour[None, :])
+        pred = preds[0]
+        cuts = []
+        j = len(tour)
+        while j > 0:
+            cuts.append((pred[j], j))
+            j = pred[j]
+        cuts.reverse()
+        return [tour[i:j] for i, j in cuts]
+
+    def refine_gbest(self):
+        # Intra-route 2-opt: each route of gbest is re-ordered on its own (depot as node 0),
+        # then the routes are chained back into a giant tour and written into the position
+        routes = []
+        gain = 0.0
+        for stops in self.route_stops(np.argsort(self.gbest)):
+            D = np.zeros((len(stops) + 1, len(stops) + 1))
+            D[0, 1:] = D[1:, 0] = self.depot_km[stops]
+            D[1:, 1:] = self.leg_km(stops[:, None], stops[None, :])
+            order, delta = two_opt_cycle(np.arange(len(stops) + 1), D)
+            routes.append(stops[order[1:] - 1])
+            gain += delta
+        if gain >= 0:
+            return None
+        position = np.empty_like(self.gbest)
+        position[np.concatenate(routes)] = np.sort(self.gbest)
+        fit, c, s, t = self.evaluate(position)
+        if fit >= self.gbest_fitness:
+            return None
+        self.gbest = position
+        self.gbest_fitness = fit
+        return {"time": t, "cost": c, "sat": s}
+
+    def decode_routes(self, position):
+        routes = []
+        for k, stops in enumerate(self.route_stops(np.argsort(position))):
+            vehicle = self.fleet.iloc[k] if k < len(self.fleet) else None
+            legs = self.leg_km(stops[:-1], stops[1:])
+            routes.append({
+                "vehicle_id": vehicle["vehicle_id"] if vehicle is not None else "VH-EXTRA",
+                "capacity_kg": float(vehicle["max_load_kg"]) if vehicle is not None else self.capacity,
+                "load_kg": round(float(self.demand[stops].sum()), 2),
+                "distance_km": round(float(self.depot_km[stops[0]] + legs.sum() + self.depot_km[stops[-1]]), 2),
+                "orders": [self.locations[s] for s in stops]
+            })
+        return routes
+
+    def build_result(self, run, algorithm="Improved QPSO (giant tour + Split) + Simulated Annealing - CVRP"):
+        routes = self.decode_routes(run["gbest"])
+        best_metrics = run["best_metrics"]
+        return {
+            "algorithm": algorithm,
+            "num_orders": self.dim,
+            "vehicles_available": len(self.fleet),
+            "vehicles_used": len(routes),
+            "routes": routes,
+            "total_distance_km": round(sum(r["distance_km"] for r in routes), 2),
+            "min_total_time": round(best_metrics.get("time", 0), 2),
+            "distribution_cost": round(best_metrics.get("cost", 0), 2),
+            "convergence": run["history"],
+            "metrics": {
+                "iterations": len(run["history"]),
+                "max_iter": self.max_iter,
+                "stop_reason": run["stop_reason"],
+                "elapsed_ms": round(run["elapsed_ms"], 2),
+                "final_objective": round(run["gbest_fitness"], 4)
+            }
+        }
+
+    def optimize(self, time_budget_ms=None, local_search_interval=None, on_iteration=None):
+        # No leg tables: Split prices each giant tour straight from coordinates
+        return self.build_result(self.search(time_budget_ms=time_budget_ms, local_search_interval=local_search_interval,
+                                             on_iteration=on_iteration))
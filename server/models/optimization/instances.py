@@ -0,0 +1,167 @@
+import os
+import re
+import numpy as np
+
+# Readers for TSPLIB (.tsp, .opt.tour) and CVRPLIB (.vrp, .sol) instance files.
+# Distances follow the TSPLIB conventions (nint rounding, ATT pseudo-Euclidean, GEO).
+
+SECTIONS = ("NODE_COORD_SECTION", "DEMAND_SECTION", "DEPOT_SECTION", "EDGE_WEIGHT_SECTION",
+            "DISPLAY_DATA_SECTION", "TOUR_SECTION", "FIXED_EDGES_SECTION")
+
+def nint(x):
+    return np.floor(np.asarray(x) + 0.5)
+
+def read_sections(path):
+    # Header "KEY : VALUE" pairs plus the raw number tokens of every *_SECTION
+    header, sections = {}, {}
+    current = None
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line == "EOF":
+                continue
+            key = line.split(":")[0].strip().upper()
+            if key in SECTIONS:
+                current = key
+                sections[current] = []
+                # Some writers put data on the section line itself
+                rest = line[len(key):].strip(" :")
+                if rest:
+                    sections[current].extend(rest.split())
+            elif current is None or ":" in line:
+                k, _, v = line.partition(":")
+                header[k.strip().upper()] = v.strip()
+                current = None
+            else:
+                sections[current].extend(line.split())
+    return header, sections
+
+def geo_radians(v):
+    # TSPLIB GEO: DDD.MM (degrees.minutes) to radians, with TSPLIB's PI
+    deg = np.trunc(v)
+    return 3.141592 * (deg + 5.0 * (v - deg) / 3.0) / 180.0
+
+def distance_matrix(coords, weight_type):
+    x, y = coords[:, 0], coords[:, 1]
+    dx = x[:, None] - x[None, :]
+    dy = y[:, None] - y[None, :]
+    if weight_type == "EUC_2D":
+        return nint(np.sqrt(dx ** 2 + dy ** 2))
+    if weight_type == "CEIL_2D":
+        return np.ceil(np.sqrt(dx ** 2 + dy ** 2))
+    if weight_type == "MAN_2D":
+        return nint(np.abs(dx) + np.abs(dy))
+    if weight_type == "MAX_2D":
+        return np.maximum(nint(np.abs(dx)), nint(np.abs(dy)))
+    if weight_type == "ATT":
+        r = np.sqrt((dx ** 2 + dy ** 2) / 10.0)
+        t = nint(r)
+        return np.where(t < r, t + 1, t)
+    if weight_type == "GEO":
+        lat, lon = geo_radians(x), geo_radians(y)
+        q1 = np.cos(lon[:, None] - lon[None, :])
+        q2 = np.cos(lat[:, None] - lat[None, :])
+        q3 = np.cos(lat[:, None] + lat[None, :])
+        d = np.floor(6378.388 * np.arccos(np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0)) + 1.0)
+        np.fill_diagonal(d, 0.0)
+        return d
+    raise ValueError(f"Unsupported EDGE_WEIGHT_TYPE {weight_type}")
+
+def explicit_matrix(values, n, fmt):
+    values = np.asarray(values, dtype=float)
+    matrix = np.zeros((n, n))
+    if fmt == "FULL_MATRIX":
+        return values[:n * n].reshape(n, n)
+    rows = {
+        "UPPER_ROW": [(i, j) for i in range(n) for j in range(i + 1, n)],
+        "LOWER_ROW": [(i, j) for i in range(n) for j in range(i)],
+        "UPPER_DIAG_ROW": [(i, j) for i in range(n) for j in range(i, n)],
+        "LOWER_DIAG_ROW": [(i, j) for i in range(n) for j in range(i + 1)],
+    }.get(fmt)
+    if rows is None:
+        raise ValueError(f"Unsupported EDGE_WEIGHT_FORMAT {fmt}")
+    i, j = np.array(rows).T
+    matrix[i, j] = values[:len(rows)]
+    matrix[j, i] = values[:len(rows)]
+    return matrix
+
+def find_optimum(path, header, matrix):
+    # Known optimum from (in order) a sidecar .opt.tour / .sol, optima.json in the same
+    # directory, or an "Optimal value" note in the COMMENT line
+    base = re.sub(r"\.(tsp|vrp)$", "", path)
+    name = os.path.basename(base)
+
+    if os.path.exists(base + ".opt.tour"):
+        _, sections = read_sections(base + ".opt.tour")
+        tour = [int(v) - 1 for v in sections.get("TOUR_SECTION", []) if int(v) > 0]
+        if tour:
+            return float(matrix[tour, np.roll(tour, -1)].sum())
+    if os.path.exists(base + ".sol"):
+        with open(base + ".sol", "r") as f:
+            for line in f:
+                if line.lower().startswith("cost"):
+                    return float(line.split()[-1])
+
+    optima_path = os.path.join(os.path.dirname(path), "optima.json")
+    if os.path.exists(optima_path):
+        import json
+        with open(optima_path, "r") as f:
+            optima = json.load(f)
+        if name in optima:
+            return float(optima[name])
+
+    match = re.search(r"(?:optimal|best)(?: value)?\s*[:=]?\s*(\d+(?:\.\d+)?)", header.get("COMMENT", ""), re.I)
+    if match:
+        return float(match.group(1))
+    return None
+
+def load_instance(path):
+    """
+    Parse a TSPLIB .tsp or CVRPLIB .vrp file. Returns a dict with name, type ("TSP"/"CVRP"),
+    dimension, the full distance matrix, coords (if any), and for CVRP the capacity,
+    demands, depot index and vehicle count (from the -kN name suffix or the COMMENT).
+    """
+    header, sections = read_sections(path)
+    n = int(header["DIMENSION"])
+    problem = header.get("TYPE", "TSP").split()[0].upper()
+    weight_type = header.get("EDGE_WEIGHT_TYPE", "EUC_2D").upper()
+
+    coords = None
+    if "NODE_COORD_SECTION" in sections:
+        coords = np.asarray(sections["NODE_COORD_SECTION"], dtype=float).reshape(n, -1)[:, 1:3]
+
+    if weight_type == "EXPLICIT":
+        matrix = explicit_matrix(sections["EDGE_WEIGHT_SECTION"], n,
+                                 header.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX").upper())
+    else:
+        matrix = distance_matrix(coords, weight_type)
+
+    instance = {
+        "name": header.get("NAME", os.path.basename(path)).strip(),
+        "path": path,
+        "type": "CVRP" if problem == "CVRP" else "TSP",
+        "dimension": n,
+        "edge_weight_type": weight_type,
+        "matrix": matrix,
+        "coords": coords
+    }
+
+    if instance["type"] == "CVRP":
+        demands = np.asarray(sections["DEMAND_SECTION"], dtype=float).reshape(n, 2)[:, 1]
+        depots = [int(v) - 1 for v in sections.get("DEPOT_SECTION", ["1"]) if int(v) > 0]
+        match = re.search(r"-k(\d+)", instance["name"]) or re.search(r"trucks\s*:\s*(\d+)", header.get("COMMENT", ""), re.I)
+        instance.update({
+            "capacity": float(header["CAPACITY"]),
+            "demands": demands,
+            "depot": depots[0] if depots else 0,
+            "vehicles": int(match.group(1)) if match else None
+        })
+
+    instance["optimum"] = find_optimum(path, header, matrix)
+    return instance
+
+def list_instances(directory):
+    return sorted(
+        os.path.join(directory, f) for f in os.listdir(directory)
+        if f.endswith(".tsp") or f.endswith(".vrp")
+    )
@@ -0,0 +1,19 @@
+from models.optimization.iqpso_sa import IQPSO_SA
+
+class IQPSO_Pure(IQPSO_SA):
+    """
+    Plain QPSO baseline: the same swarm update without the SA acceptance step (every
+    proposal replaces its particle), no early stopping and no local search.
+    """
+    def __init__(self, num_particles=30, max_iter=100):
+        super().__init__(num_particles=num_particles, max_iter=max_iter)
+        self.stall_window = None
+        self.local_search_interval = None
+
+    def move(self, x_new, current_fitnesses, temp):
+        # Every proposal is taken, so it is not scored here; the next iteration evaluates it
+        self.particles = x_new
+
+    def optimize(self, time_budget_ms=None, start_time=None, on_iteration=None, use_cache=False, seed_solution=None):
+        return super().optimize(time_budget_ms=time_budget_ms, start_time=start_time, on_iteration=on_iteration,
+                                use_cache=use_cache, seed_solution=seed_solution)
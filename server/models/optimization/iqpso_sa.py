@@ -1,34 +1,53 @@
 import numpy as np
-import random
-import math
+import os
+import time
+import copy
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from models.traffic_analyzer import traffic_analyzer
 from models.results_analyzer import COORDINATES_MAP
+from models.optimization.islands import run_islands
+from models.optimization.local_search import improve_route
+from models.optimization.pareto import run_pareto
+from models.optimization.vehicle_pool import vehicle_pool
+from models.cache_utils import TTLCache
 from datetime import datetime
 
+_process_pool = None
+
+def shutdown_process_pool():
+    # Called on server shutdown so pooled workers do not outlive the API process
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    # Element-wise great-circle distance (km); inputs in degrees, any broadcastable shapes
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def haversine_matrix(lats, lons):
+    # Pairwise great-circle distances (km) between all points
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    return haversine_km(lats[:, None], lons[:, None], lats[None, :], lons[None, :])
+
 class IQPSO_SA:
     def __init__(self, num_particles=30, max_iter=100):
         self.num_particles = num_particles
         self.max_iter = max_iter
-        self.locations = list(COORDINATES_MAP.keys())
+        # Leg tensors are built over every known location (universe); an optimizer may route a
+        # subset of them (e.g. the unvisited suffix of a live route) and slices the tensor
+        self.universe = list(COORDINATES_MAP.keys())
+        self.locations = list(self.universe)
         self.dim = len(self.locations)
+        # Index of a location pinned to the front of every route (a vehicle's current stop), or None
+        self.fixed_first = None
         
-        self.vehicle_map = {}
-        try:
-            import pandas as pd
-            import os
-            path = 'models/data/data_sets/vehicle_data.csv'
-            if not os.path.exists(path): path = 'server/models/data/data_sets/vehicle_data.csv'
-            
-            if os.path.exists(path):
-                vdf = pd.read_csv(path)
-                # GROUP BY Service Area
-                if 'service_area' in vdf.columns:
-                    for _, row in vdf.iterrows():
-                        area = row['service_area']
-                        if area not in self.vehicle_map: self.vehicle_map[area] = []
-                        self.vehicle_map[area].append(row['vehicle_id'])
-        except Exception as e:
-            print(f"Error loading vehicle map: {e}")
+        # Fleet registry (loaded on first assignment) used to pick a vehicle per stop
+        self.vehicle_pool = vehicle_pool
         
         # QPSO Parameters
         self.alpha_start = 1.0
@@ -43,9 +62,39 @@ class IQPSO_SA:
         self.w2 = 0.3 # Weight for Satisfaction (Maximize)
         
         # Normalization Factors (Estimates)
-        # Cost range is now ~50-350 per node. 
-        self.max_cost = 400.0 * self.dim 
-        self.max_sat = 10.0 * self.dim   # Max satisfaction
+        # Cost range is ~50-350 per leg; a route over dim nodes has dim - 1 legs.
+        self.num_legs = max(self.dim - 1, 1)
+        self.max_cost = 400.0 * self.num_legs
+        self.max_sat = 10.0 * self.num_legs   # Max satisfaction
+        
+        # Stopping criteria: stop when gbest improved by less than stall_tol (relative)
+        # over the last stall_window iterations, or when time_budget_ms of wall-clock is spent
+        self.stall_window = 20
+        self.stall_tol = 1e-4
+        self.time_budget_ms = None
+        
+        # Warm start: share of the swarm initialized around a seed solution, and the spread around it
+        self.warm_start_fraction = 0.5
+        self.warm_start_sigma = 1.0
+        
+        # 2-opt / Or-opt refinement of gbest every local_search_interval iterations (None disables)
+        self.local_search_interval = None
+        
+        # Leg tensors hold one matrix per time bucket (minutes) over the whole day and are
+        # cached per (day, season) so repeat calls skip inference. The cache (and the model
+        # signature it flushes on) is one object shared by clones and subproblems
+        self.time_bucket_minutes = 15
+        self.leg_cache = TTLCache(
+            max_size=32, ttl_seconds=float("inf"),
+            watch_paths=(traffic_analyzer.model_path, traffic_analyzer.encoders_path)
+        )
+        
+        # Whole optimize() results, keyed by location set, departure bucket, day, season,
+        # weights and swarm parameters; flushed when the traffic model artifacts change
+        self.result_cache = TTLCache(
+            max_size=128, ttl_seconds=120.0,
+            watch_paths=(traffic_analyzer.model_path, traffic_analyzer.encoders_path)
+        )
         
         # State
         self.particles = []     
@@ -53,79 +102,212 @@ class IQPSO_SA:
         self.pbest_fitness = [] 
         self.gbest = None       
         self.gbest_fitness = float('inf')
+        self.rng = np.random.default_rng()
         
         self.costs_cache = {}
+        self.leg_time = np.zeros((self.dim, self.dim))
+        self.leg_cost = np.zeros((self.dim, self.dim))
+        self.leg_sat = np.zeros((self.dim, self.dim))
+        self.leg_time_td = self.leg_time[None]
+        self.leg_cost_td = self.leg_cost[None]
+        self.leg_sat_td = self.leg_sat[None]
+        self.depart_minute = 0
 
-    def initialize(self):
-        self.particles = np.random.uniform(-10, 10, (self.num_particles, self.dim))
+    def initialize(self, seed_position=None):
+        self.particles = self.rng.uniform(-10, 10, (self.num_particles, self.dim))
+        
+        # Warm start: part of the swarm is the seed plus small noise, the rest stays uniform for diversity
+        if seed_position is not None:
+            n_seeded = max(1, int(self.num_particles * self.warm_start_fraction))
+            noise = self.rng.normal(0.0, self.warm_start_sigma, (n_seeded, self.dim))
+            noise[0] = 0.0 # keep the seed itself
+            self.particles[:n_seeded] = seed_position + noise
+        
+        # A pinned start sits far below the [-10, 10] range in every particle; pbest, gbest and
+        # mbest then share that value, so the QPSO update keeps it first
+        if self.fixed_first is not None:
+            self.particles[:, self.fixed_first] = -1e3
+        
         self.pbest = np.copy(self.particles)
         self.pbest_fitness = np.full(self.num_particles, float('inf'))
         self.gbest_fitness = float('inf')
+
+    def seed_to_position(self, seed):
+        """
+        Continuous position for a warm start. seed is either a previous gbest position or a
+        best_sequence of location names; locations missing from the sequence go after it.
+        """
+        if seed is None:
+            return None
+        if len(seed) and not isinstance(seed[0], str):
+            position = np.asarray(seed, dtype=float)
+            if position.shape != (self.dim,):
+                raise ValueError(f"Seed position has shape {position.shape}, expected ({self.dim},)")
+            return position
+        
+        unknown = [loc for loc in seed if loc not in self.locations]
+        if unknown:
+            raise ValueError(f"Unknown locations in seed sequence: {unknown}")
+        if len(set(seed)) != len(seed):
+            raise ValueError(f"Duplicate locations in seed sequence: {sorted({loc for loc in seed if seed.count(loc) > 1})}")
+        order = list(seed) + [loc for loc in self.locations if loc not in seed]
+        ranks = np.linspace(-10, 10, self.dim)
+        position = np.empty(self.dim)
+        for rank, loc in enumerate(order):
+            position[self.locations.index(loc)] = ranks[rank]
+        return position
         
     def get_permutation(self, continuous_position):
         # SPV Rule: Sort indices based on continuous values
         # e.g. [0.5, 0.1, 0.9] -> indices [1, 0, 2]
         return np.argsort(continuous_position)
 
-    def precompute_costs(self):
-        # Pre-fetch predictions for all locations to speed up evaluation
-        # We assume independent legs for now (A->B depends on A and B, but simplified to N nodes visitation cost)
-        # Actually, prediction depends on Route + Time. 
-        # Since we optimize sequence, we ideally query (Node A -> Node B).
-        # But traffic_analyzer.predict takes 'route_name'.
-        # Our locations are 'Nodes'. 'Routes' connect them.
-        # This implementation assumes we visit locations. The cost is associated with the LOCATION or the EDGE?
-        # The simulators use "Route Name" (e.g. "Kompally").
-        # If 'locations' are ["Kompally", "Gachibowli"...], then visiting "Kompally" incurs cost.
-        
-        dt = datetime.now()
-        time_str = dt.strftime("%H:%M")
+    def get_time_context(self, start_time=None, dt=None):
+        # Departure minute-of-day (start_time "HH:MM" or now) plus the day/season the tensor is built for
+        dt = dt or datetime.now()
+        if start_time:
+            hour, minute = (int(v) for v in start_time.split(":")[:2])
+            if not (0 <= hour < 24 and 0 <= minute < 60):
+                raise ValueError(f"start_time out of range: {start_time} (expected HH:MM)")
+        else:
+            hour, minute = dt.hour, dt.minute
+        
         day = dt.strftime("%A")
         season = "Winter"
         if 3 <= dt.month <= 5: season = "Summer"
         if 6 <= dt.month <= 9: season = "Monsoon"
-        is_peak = 1 if (8 <= dt.hour <= 11) or (17 <= dt.hour <= 21) else 0
-        
-        costs = {}
-        for loc in self.locations:
-            try:
-                pred = traffic_analyzer.predict(loc, time_str, day, season, is_peak, range_km=10.0)
-                if pred:
-                    costs[loc] = {
-                        "t_idx": pred[0],
-                        "time": pred[1],
-                        "cost": pred[2],
-                        "sat": pred[3],
-                        "vid": self.get_vehicle_for_loc(loc) # Assign Vehicle ID
-                    }
-                else:
-                    costs[loc] = {"t_idx": 50, "time": 20, "cost": 500, "sat": 5, "vid": "VH-NA"}
-            except Exception as e:
-                print(f"Error predicting for {loc}: {e}")
-                costs[loc] = {"t_idx": 50, "time": 20, "cost": 500, "sat": 5, "vid": "VH-NA"}
-        return costs
-
-    def get_vehicle_for_loc(self, loc):
-        pool = self.vehicle_map.get(loc, [])
-        if pool:
-            return random.choice(pool)
-        return "VH-GEN"
+        
+        return {
+            "depart_minute": hour * 60 + minute,
+            "day": day,
+            "season": season
+        }
 
-    def evaluate(self, position):
-        perm = self.get_permutation(position)
-        ordered_locs = [self.locations[i] for i in perm]
-        
-        total_time = 0
-        total_cost = 0
-        total_sat = 0
-        
-        for loc in ordered_locs:
-            c = self.costs_cache.get(loc, {})
-            total_time += c.get("time", 20)
-            total_cost += c.get("cost", 500)
-            total_sat += c.get("sat", 5)
-            
+    def precompute_costs(self, start_time=None):
+        # Pre-fetch predictions for every leg (A -> B) in every time bucket of the day:
+        # tables[name] has shape [time_bucket, from, to].
+        # traffic_analyzer.predict takes a 'route_name', so leg A -> B is scored as travelling
+        # the destination's route for the great-circle distance between A and B, departing at the bucket start.
+        ctx = self.get_time_context(start_time)
+        key = (ctx["day"], ctx["season"])
+        
+        # A retrained or replaced model flushes every cached tensor (watch_paths)
+        cached = self.leg_cache.get(key)
+        if cached is None:
+            cached = self.build_leg_tensor(ctx["day"], ctx["season"])
+            if cached is None:
+                return self.fallback_leg_tables(ctx)
+            self.leg_cache.set(key, cached)
+        
+        # Slice the universe tensor down to this optimizer's locations
+        idx = np.array([self.universe.index(loc) for loc in self.locations])
+        tables = {"dist_km": cached["dist_km"][np.ix_(idx, idx)]}
+        for name in ("t_idx", "time", "cost", "sat"):
+            tables[name] = cached[name][:, idx[:, None], idx[None, :]]
+        tables["depart_minute"] = ctx["depart_minute"]
+        return tables
+
+    def fallback_leg_tables(self, ctx):
+        # Flat leg values if the model is unavailable (not cached so the next call retries)
+        n_buckets = (24 * 60) // self.time_bucket_minutes
+        tables = {
+            "t_idx": np.full((n_buckets, self.dim, self.dim), 50.0),
+            "time": np.full((n_buckets, self.dim, self.dim), 20.0),
+            "cost": np.full((n_buckets, self.dim, self.dim), 500.0),
+            "sat": np.full((n_buckets, self.dim, self.dim), 5.0),
+            "depart_minute": ctx["depart_minute"]
+        }
+        idx = np.arange(self.dim)
+        for name in ("t_idx", "time", "cost", "sat"):
+            tables[name][:, idx, idx] = 0.0
+        return tables
+
+    def build_leg_tensor(self, day, season):
+        n_buckets = (24 * 60) // self.time_bucket_minutes
+        n = len(self.universe)
+        dist_km = haversine_matrix(
+            [COORDINATES_MAP[loc]["lat"] for loc in self.universe],
+            [COORDINATES_MAP[loc]["lon"] for loc in self.universe]
+        )
+        
+        # Every (bucket, from, to) with from != to, flattened into one batch
+        frm, to = np.nonzero(~np.eye(n, dtype=bool))
+        bucket = np.repeat(np.arange(n_buckets), len(frm))
+        frm = np.tile(frm, n_buckets)
+        to = np.tile(to, n_buckets)
+        
+        minutes = bucket * self.time_bucket_minutes
+        hours = minutes // 60
+        time_str = [f"{m // 60:02d}:{m % 60:02d}" for m in minutes]
+        is_peak = (((8 <= hours) & (hours <= 11)) | ((17 <= hours) & (hours <= 21))).astype(int)
+        
+        try:
+            # Single batched inference for all n_buckets * n * (n - 1) legs
+            preds = traffic_analyzer.predict_many(
+                [self.universe[j] for j in to], time_str, day, season,
+                is_peak=is_peak, range_km=dist_km[frm, to]
+            )
+        except Exception as e:
+            print(f"Error predicting leg costs: {e}")
+            preds = None
+        if preds is None or np.isnan(preds).any():
+            return None
+        
+        tables = {"dist_km": dist_km}
+        for col, name in enumerate(("t_idx", "time", "cost", "sat")):
+            tensor = np.zeros((n_buckets, n, n))
+            tensor[bucket, frm, to] = preds[:, col]
+            tables[name] = tensor
+        return tables
+
+    def assign_vehicles(self, perm):
+        # One distinct vehicle per stop from a single assignment solve; a stop's fuel cost is
+        # priced on the leg that reaches it
+        dist_km = self.costs_cache.get("dist_km") if isinstance(self.costs_cache, dict) else None
+        stops = []
+        for k, i in enumerate(perm):
+            distance = float(dist_km[perm[k - 1], i]) if (dist_km is not None and k > 0) else 0.0
+            stops.append({"location": self.locations[i], "distance_km": distance})
+        return self.vehicle_pool.assign(stops)
+
+    def load_leg_tables(self, tables):
+        self.costs_cache = tables
+        self.leg_time_td = tables["time"]
+        self.leg_cost_td = tables["cost"]
+        self.leg_sat_td = tables["sat"]
+        self.depart_minute = tables["depart_minute"]
+        
+        # Static slice at the departure bucket, used where a single leg matrix is needed (local search)
+        bucket = (self.depart_minute // self.time_bucket_minutes) % len(self.leg_time_td)
+        self.leg_time = self.leg_time_td[bucket]
+        self.leg_cost = self.leg_cost_td[bucket]
+        self.leg_sat = self.leg_sat_td[bucket]
+
+    def prepare(self, start_time=None):
+        self.load_leg_tables(self.precompute_costs(start_time))
 
+    def evaluate_batch(self, positions):
+        # SPV decode of every particle at once: (num_particles, dim) -> (num_particles, dim) permutations
+        perms = np.argsort(positions, axis=1)
+        n = len(perms)
+        n_buckets = len(self.leg_time_td)
+        
+        # Walk the legs perm[k] -> perm[k+1] for the whole swarm, propagating arrival time so each
+        # leg is looked up in the bucket the vehicle actually departs in
+        clock = np.full(n, float(self.depart_minute))
+        total_time = np.zeros(n)
+        total_cost = np.zeros(n)
+        total_sat = np.zeros(n)
+        for k in range(self.dim - 1):
+            frm = perms[:, k]
+            to = perms[:, k + 1]
+            bucket = (clock // self.time_bucket_minutes).astype(int) % n_buckets
+            leg_time = self.leg_time_td[bucket, frm, to]
+            total_time += leg_time
+            total_cost += self.leg_cost_td[bucket, frm, to]
+            total_sat += self.leg_sat_td[bucket, frm, to]
+            clock += leg_time
+        
         norm_cost = total_cost / self.max_cost
         norm_sat = total_sat / self.max_sat # 1 is best
         
@@ -133,9 +315,75 @@ class IQPSO_SA:
         
         return objective, total_cost, total_sat, total_time
 
-    def optimize(self):
-        self.initialize()
-        self.costs_cache = self.precompute_costs()
+    def evaluate(self, position):
+        fit, cost, sat, total_time = self.evaluate_batch(np.atleast_2d(position))
+        return float(fit[0]), float(cost[0]), float(sat[0]), float(total_time[0])
+
+    def propose(self, alpha, mbest):
+        # QPSO Update Equation for the whole swarm; every draw is a (num_particles, dim) tensor
+        shape = self.particles.shape
+        # Phi ~ U(0, 1)
+        phi = self.rng.random(shape)
+        # p_id = local attractor
+        p = (phi * self.pbest) + ((1 - phi) * self.gbest)
+        
+        u = self.rng.random(shape)
+        # +/- depends on probability 0.5
+        sign = np.where(self.rng.random(shape) > 0.5, 1, -1)
+        
+        # New Positions Proposed
+        return p + (sign * alpha * np.abs(mbest - self.particles) * np.log(1 / u))
+
+    def move(self, x_new, current_fitnesses, temp):
+        # Evaluation of all new positions in one pass, then SA acceptance on the fitness change
+        new_fitnesses, _, _, _ = self.evaluate_batch(x_new)
+        accepted = self.accept(new_fitnesses - current_fitnesses, temp)
+        self.particles[accepted] = x_new[accepted]
+
+    def accept(self, delta, temp):
+        # SA Acceptance: improvements always pass, otherwise Metropolis Criterion
+        prob = np.exp(-np.maximum(delta, 0) / (temp + 1e-9))
+        return (delta < 0) | (self.rng.random(len(delta)) < prob)
+
+    def get_leg_weights(self):
+        # Per-leg contribution to the objective (the constant w2 term dropped); used by local search
+        W = (self.w1 * self.leg_cost / self.max_cost) - (self.w2 * self.leg_sat / self.max_sat)
+        if self.fixed_first is not None:
+            # Moves that put anything in front of the pinned start never pay off
+            W = W.copy()
+            W[:, self.fixed_first] = 1e6
+        return W
+
+    def refine_gbest(self):
+        # 2-opt / Or-opt on the decoded gbest permutation, then write the improved order
+        # back into the continuous position by re-assigning its sorted values (SPV inverse)
+        perm = self.get_permutation(self.gbest)
+        new_perm, delta = improve_route(perm, self.get_leg_weights())
+        if delta >= 0:
+            return None
+        position = np.empty_like(self.gbest)
+        position[new_perm] = np.sort(self.gbest)
+        fit, c, s, t = self.evaluate(position)
+        if fit >= self.gbest_fitness:
+            return None
+        self.gbest = position
+        self.gbest_fitness = fit
+        return {"time": t, "cost": c, "sat": s}
+
+    def search(self, rng=None, migrate=None, migration_interval=None, time_budget_ms=None,
+               local_search_interval=None, on_iteration=None, seed_position=None):
+        # Run one swarm against the already loaded leg tables.
+        # migrate(optimizer, it) is called every migration_interval iterations (island mode);
+        # on_iteration(it, gbest_fitness) after every iteration (progress streaming).
+        if rng is not None:
+            self.rng = rng
+        if time_budget_ms is None:
+            time_budget_ms = self.time_budget_ms
+        if local_search_interval is None:
+            local_search_interval = self.local_search_interval
+        start = time.perf_counter()
+        stop_reason = "max_iter"
+        self.initialize(seed_position)
         
         # Temperature for SA
         temp = self.initial_temp
@@ -148,91 +396,294 @@ class IQPSO_SA:
             alpha = self.alpha_start - ((self.alpha_start - self.alpha_end) * (it / self.max_iter))
             
             # 1. Update Personal Best
-            current_fitnesses = []
-            for i in range(self.num_particles):
-                fit, cost, sat, time = self.evaluate(self.particles[i])
-                current_fitnesses.append(fit)
-                
-                # Check PBest
-                if fit < self.pbest_fitness[i]:
-                    self.pbest[i] = self.particles[i].copy()
-                    self.pbest_fitness[i] = fit
+            current_fitnesses, _, _, _ = self.evaluate_batch(self.particles)
+            
+            improved = current_fitnesses < self.pbest_fitness
+            self.pbest[improved] = self.particles[improved]
+            self.pbest_fitness[improved] = current_fitnesses[improved]
             
             # 2. Update Global Best
             min_idx = np.argmin(self.pbest_fitness)
             if self.pbest_fitness[min_idx] < self.gbest_fitness:
-                self.gbest_fitness = self.pbest_fitness[min_idx]
+                self.gbest_fitness = float(self.pbest_fitness[min_idx])
                 self.gbest = self.pbest[min_idx].copy()
                 
                 # Store metrics for result
                 _, c, s, t = self.evaluate(self.gbest)
                 best_metrics = {"time": t, "cost": c, "sat": s}
             
+            # 2b. Local search refinement of gbest every K iterations
+            if local_search_interval and it % local_search_interval == 0:
+                refined = self.refine_gbest()
+                if refined:
+                    best_metrics = refined
+            
             # 3. Calculate Mean Best (mbest) - Center of PBest positions
             mbest = np.mean(self.pbest, axis=0)
             
             # 4. Update Particles (QPSO + SA)
-            for i in range(self.num_particles):
-                # QPSO Update Equation
-                # Phi ~ U(0, 1)
-                phi = np.random.rand(self.dim)
-                # p_id = local attractor
-                p = (phi * self.pbest[i]) + ((1 - phi) * self.gbest)
-                
-                u = np.random.rand(self.dim)
-                # +/- depends on probability 0.5
-                sign = np.where(np.random.rand(self.dim) > 0.5, 1, -1)
-                
-                # New Position Proposed
-                x_new = p + (sign * alpha * np.abs(mbest - self.particles[i]) * np.log(1 / u))
-                
-                # Evaluation of new position
-                fit_new, _, _, _ = self.evaluate(x_new)
-                
-                # Fitness change
-                delta = fit_new - current_fitnesses[i]
-                
-                # SA Acceptance
-                accepted = False
-                if delta < 0:
-                    accepted = True
-                else:
-                    # Metropolis Criterion
-                    prob = math.exp(-delta / (temp + 1e-9))
-                    if random.random() < prob:
-                        accepted = True
-                        
-                if accepted:
-                    self.particles[i] = x_new
+            x_new = self.propose(alpha, mbest)
+            self.move(x_new, current_fitnesses, temp)
             
             # Cooling
             temp *= self.cooling_rate
             history.append(self.gbest_fitness)
+            if on_iteration is not None:
+                on_iteration(it, self.gbest_fitness)
+            
+            # Stopping criteria
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+            if time_budget_ms is not None and elapsed_ms >= time_budget_ms:
+                stop_reason = "time_budget"
+                break
+            if self.stall_window and len(history) > self.stall_window:
+                previous = history[-self.stall_window - 1]
+                if (previous - self.gbest_fitness) <= self.stall_tol * max(abs(previous), 1e-12):
+                    stop_reason = "converged"
+                    break
             
+            if migrate is not None and it % migration_interval == 0 and it < self.max_iter:
+                migrate(self, it)
+        
+        # Final local search pass on the answer
+        if local_search_interval:
+            refined = self.refine_gbest()
+            if refined:
+                best_metrics = refined
+                history.append(self.gbest_fitness)
+        
+        return {
+            "gbest": self.gbest.copy(),
+            "gbest_fitness": self.gbest_fitness,
+            "best_metrics": best_metrics,
+            "history": history,
+            "stop_reason": stop_reason,
+            "elapsed_ms": (time.perf_counter() - start) * 1000.0
+        }
+
+    def build_result(self, run, algorithm="Improved QPSO (SPV) + Simulated Annealing"):
         # Final Result Decoding
-        perm = self.get_permutation(self.gbest)
+        perm = self.get_permutation(run["gbest"])
         best_route_names = [self.locations[i] for i in perm]
+        best_metrics = run["best_metrics"]
         
-        best_sequence_details = []
-        for loc in best_route_names:
-            vid = self.costs_cache.get(loc, {}).get("vid", "VH-NA")
-            best_sequence_details.append({
-                "location": loc,
-                "vehicle_id": vid
-            })
+        best_sequence_details = self.assign_vehicles(perm) # Assign Vehicle IDs
         
         return {
-            "algorithm": "Improved QPSO (SPV) + Simulated Annealing",
+            "algorithm": algorithm,
             "best_sequence": best_route_names, 
             "best_sequence_details": best_sequence_details, # New detailed list
             "min_total_time": round(best_metrics.get("time", 0), 2),
             "distribution_cost": round(best_metrics.get("cost", 0), 2),
             "customer_satisfaction": round(best_metrics.get("sat", 0), 2),
-            "convergence": history,
+            "convergence": run["history"],
+            "gbest_position": run["gbest"].tolist(),
             "metrics": {
-                "iterations": self.max_iter,
-                "final_objective": round(self.gbest_fitness, 4)
+                "iterations": len(run["history"]),
+                "max_iter": self.max_iter,
+                "stop_reason": run["stop_reason"],
+                "elapsed_ms": round(run["elapsed_ms"], 2),
+                "final_objective": round(run["gbest_fitness"], 4)
             }
         }
 
+    def result_cache_key(self, start_time=None, time_budget_ms=None, local_search_interval=None,
+                         seed_position=None):
+        ctx = self.get_time_context(start_time)
+        seed_perm = tuple(self.get_permutation(seed_position).tolist()) if seed_position is not None else None
+        return (
+            tuple(self.locations), self.fixed_first,
+            ctx["depart_minute"] // self.time_bucket_minutes, ctx["day"], ctx["season"],
+            self.w1, self.w2,
+            self.num_particles, self.max_iter, self.alpha_start, self.alpha_end,
+            self.initial_temp, self.cooling_rate, self.stall_window, self.stall_tol,
+            time_budget_ms if time_budget_ms is not None else self.time_budget_ms,
+            local_search_interval if local_search_interval is not None else self.local_search_interval,
+            seed_perm, self.warm_start_fraction, self.warm_start_sigma
+        )
+
+    def optimize(self, time_budget_ms=None, local_search_interval=None, start_time=None, on_iteration=None,
+                 use_cache=True, seed_solution=None):
+        # seed_solution: previous gbest position or best_sequence to warm-start from
+        seed_position = self.seed_to_position(seed_solution)
+        
+        key = None
+        if use_cache:
+            key = self.result_cache_key(start_time, time_budget_ms, local_search_interval, seed_position)
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                result = copy.deepcopy(cached)
+                result["metrics"]["cache_hit"] = True
+                return result
+        
+        self.prepare(start_time)
+        run = self.search(time_budget_ms=time_budget_ms, local_search_interval=local_search_interval,
+                          on_iteration=on_iteration, seed_position=seed_position)
+        result = self.build_result(run)
+        result["warm_start"] = seed_position is not None
+        if key is not None:
+            self.result_cache.set(key, copy.deepcopy(result))
+        result["metrics"]["cache_hit"] = False
+        return result
+
+    def clone(self):
+        # Independent swarm state for concurrent jobs; leg cache, result cache, vehicle pool and
+        # process pool are shared. Built from __dict__ directly: __getstate__ strips those for pickling
+        other = object.__new__(type(self))
+        other.__dict__.update(self.__dict__)
+        other.rng = np.random.default_rng()
+        other.gbest = None
+        other.gbest_fitness = float('inf')
+        return other
+
+    def subproblem(self, locations, start=None):
+        """
+        Optimizer over a subset of the locations (e.g. the unvisited suffix of a route), sharing
+        this one's leg cache. start, if given, is pinned as the first stop of every route.
+        """
+        stops = ([start] if start is not None else []) + [loc for loc in locations if loc != start]
+        unknown = [loc for loc in stops if loc not in self.universe]
+        if unknown:
+            raise ValueError(f"Unknown locations: {unknown}")
+        
+        sub = self.clone()
+        sub.locations = stops
+        sub.dim = len(stops)
+        sub.fixed_first = 0 if start is not None else None
+        sub.num_legs = max(sub.dim - 1, 1)
+        sub.max_cost = 400.0 * sub.num_legs
+        sub.max_sat = 10.0 * sub.num_legs
+        return sub
+
+    def get_executor(self, max_workers=None):
+        # Keep one pool alive between requests (and shared by clones); spinning up processes
+        # per call costs more than a swarm
+        global _process_pool
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count())
+        return _process_pool
+
+    def optimize_parallel(self, n_runs=None, max_workers=None, seed=None, time_budget_ms=None,
+                          local_search_interval=None, start_time=None):
+        # Multi-start: N independent swarms, each with its own seeded Generator, on a process pool.
+        # Leg tables are computed once here and shipped to the workers with the optimizer state.
+        n_runs = n_runs or os.cpu_count() or 1
+        self.prepare(start_time)
+        
+        seeds = np.random.SeedSequence(seed).spawn(n_runs)
+        executor = self.get_executor(max_workers)
+        try:
+            runs = list(executor.map(run_swarm, [self] * n_runs, seeds, [time_budget_ms] * n_runs,
+                                     [local_search_interval] * n_runs))
+        except BrokenProcessPool:
+            # A dead worker poisons the pool; drop it so the next call starts fresh
+            global _process_pool
+            _process_pool = None
+            raise
+        
+        best = min(runs, key=lambda r: r["gbest_fitness"])
+        self.gbest = best["gbest"]
+        self.gbest_fitness = best["gbest_fitness"]
+        
+        result = self.build_result(best, algorithm=f"Improved QPSO (SPV) + Simulated Annealing (multi-start x{n_runs})")
+        result["runs"] = [
+            {
+                "run": i,
+                "final_objective": round(r["gbest_fitness"], 4),
+                "stop_reason": r["stop_reason"],
+                "convergence": r["history"]
+            }
+            for i, r in enumerate(runs)
+        ]
+        return result
+
+    def optimize_islands(self, n_islands=4, migration_interval=10, topology="ring", migrants=1,
+                         particles_per_island=None, seed=None, time_budget_ms=None, local_search_interval=None,
+                         start_time=None):
+        # Island model: sub-swarms in separate processes exchange their best particles
+        # every migration_interval iterations over a ring or fully connected topology.
+        # By default the swarm size is split across islands. Runs on a clone: this optimizer may be
+        # the shared one serving other requests, so its configuration and state stay untouched.
+        swarm = self.clone()
+        swarm.num_particles = particles_per_island or max(self.num_particles // n_islands, 2)
+        swarm.prepare(start_time)
+        runs = run_islands(swarm, n_islands, migration_interval, topology, migrants, seed, time_budget_ms,
+                           local_search_interval)
+        
+        best = min(runs, key=lambda r: r["gbest_fitness"])
+        swarm.gbest = best["gbest"]
+        swarm.gbest_fitness = best["gbest_fitness"]
+        
+        result = swarm.build_result(best, algorithm=f"Improved QPSO (SPV) + Simulated Annealing (islands x{n_islands}, {topology})")
+        # Best-so-far across all islands per iteration; islands that stopped early hold their last value
+        length = max(len(r["history"]) for r in runs)
+        padded = [r["history"] + r["history"][-1:] * (length - len(r["history"])) for r in runs]
+        result["convergence"] = np.min(padded, axis=0).tolist()
+        result["islands"] = [
+            {
+                "island": i,
+                "final_objective": round(r["gbest_fitness"], 4),
+                "stop_reason": r["stop_reason"],
+                "convergence": r["history"]
+            }
+            for i, r in enumerate(runs)
+        ]
+        result["migration"] = {"interval": migration_interval, "topology": topology, "migrants": migrants}
+        return result
+
+    def optimize_pareto(self, archive_size=50, time_budget_ms=None, start_time=None, on_iteration=None):
+        # One run returns the whole cost vs satisfaction front instead of a single w1/w2 trade-off;
+        # on_iteration gets the archive hypervolume. Runs on a clone like optimize_islands
+        swarm = self.clone()
+        swarm.prepare(start_time)
+        run = run_pareto(swarm, archive_size, time_budget_ms, on_iteration)
+        archive = run["archive"]
+        
+        front = []
+        for k in np.argsort(archive.objectives[:, 0]):
+            perm = swarm.get_permutation(archive.positions[k])
+            cost, sat, total_time = archive.metrics[k]
+            front.append({
+                "best_sequence": [swarm.locations[i] for i in perm],
+                "distribution_cost": round(float(cost), 2),
+                "customer_satisfaction": round(float(sat), 2),
+                "min_total_time": round(float(total_time), 2),
+                "gbest_position": archive.positions[k].tolist()
+            })
+        
+        # Knee point: the member closest to the ideal corner of the normalised front
+        span = np.ptp(archive.objectives, axis=0)
+        scaled = (archive.objectives - archive.objectives.min(axis=0)) / np.where(span > 0, span, 1.0)
+        knee = int(np.argsort(np.argsort(archive.objectives[:, 0]))[np.argmin(np.linalg.norm(scaled, axis=1))])
+        
+        return {
+            "algorithm": "Improved QPSO (SPV) + Simulated Annealing (Pareto archive)",
+            "front": front,
+            "knee_index": knee,
+            "convergence": run["history"],
+            "metrics": {
+                "iterations": len(run["history"]),
+                "max_iter": self.max_iter,
+                "stop_reason": run["stop_reason"],
+                "elapsed_ms": round(run["elapsed_ms"], 2),
+                "front_size": len(front),
+                "archive_size": archive_size,
+                "hypervolume": round(run["history"][-1], 6) if run["history"] else 0.0
+            }
+        }
+
+    def __getstate__(self):
+        # Pickling for process workers only (clone() does not go through here): workers only
+        # need swarm parameters and the loaded leg tables
+        state = self.__dict__.copy()
+        state["vehicle_pool"] = None
+        state["leg_cache"] = None
+        state["result_cache"] = None
+        return state
+
+def run_swarm(optimizer, seed, time_budget_ms=None, local_search_interval=None):
+    # Process pool entry point: one independent swarm per seed
+    return optimizer.search(np.random.default_rng(seed), time_budget_ms=time_budget_ms,
+                            local_search_interval=local_search_interval)
+
 iqpso_sa_optimizer = IQPSO_SA()
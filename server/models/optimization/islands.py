@@ -0,0 +1,144 @@
+import multiprocessing as mp
+import queue
+import numpy as np
+
+TOPOLOGIES = ("ring", "full")
+
+def get_neighbours(island, n_islands, topology):
+    # Islands that receive this island's emigrants
+    if topology == "ring":
+        return [(island + 1) % n_islands] if n_islands > 1 else []
+    if topology == "full":
+        return [j for j in range(n_islands) if j != island]
+    raise ValueError(f"Unknown migration topology '{topology}', expected one of {TOPOLOGIES}")
+
+class IslandMigration:
+    """
+    Migration hook passed to IQPSO_SA.search(). Every call sends this island's best
+    pbest particles to its neighbours and replaces its worst particles with the immigrants.
+    Messages are (sender, iteration, positions, fitnesses); iteration None means the
+    sender has stopped and will not migrate again. A neighbour silent for timeout seconds
+    (killed without closing) raises instead of blocking the island forever.
+    """
+    def __init__(self, island, inbox, outboxes, senders, migrants=1, timeout=60.0):
+        self.island = island
+        self.inbox = inbox
+        self.outboxes = outboxes
+        self.active = set(senders)
+        self.migrants = migrants
+        self.timeout = timeout
+        # Messages from neighbours that are already one exchange ahead of us
+        self.early = []
+
+    def receive(self, it):
+        received = {m[0]: m for m in self.early if m[1] == it}
+        self.early = [m for m in self.early if m[1] != it]
+        while not self.active.issubset(received):
+            try:
+                msg = self.inbox.get(timeout=self.timeout)
+            except queue.Empty:
+                waiting = sorted(self.active - set(received))
+                raise RuntimeError(f"Island {self.island}: no migration from islands {waiting} in {self.timeout}s")
+            sender, msg_it = msg[0], msg[1]
+            if msg_it is None:
+                self.active.discard(sender)
+            elif msg_it == it:
+                received[sender] = msg
+            else:
+                self.early.append(msg)
+        return list(received.values())
+
+    def close(self):
+        # Tell neighbours not to wait for us any more (early stop or last iteration)
+        for q in self.outboxes:
+            q.put((self.island, None, None, None))
+
+    def __call__(self, optimizer, it):
+        order = np.argsort(optimizer.pbest_fitness)[:self.migrants]
+        msg = (self.island, it, optimizer.pbest[order].copy(), optimizer.pbest_fitness[order].copy())
+        for q in self.outboxes:
+            q.put(msg)
+        
+        received = self.receive(it)
+        if not received:
+            return
+        positions = np.concatenate([m[2] for m in received])
+        fitnesses = np.concatenate([m[3] for m in received])
+        
+        # Immigrants replace the worst particles; the next iteration promotes them to gbest if better
+        worst = np.argsort(optimizer.pbest_fitness)[::-1][:len(fitnesses)]
+        optimizer.particles[worst] = positions[:len(worst)]
+        optimizer.pbest[worst] = positions[:len(worst)]
+        optimizer.pbest_fitness[worst] = fitnesses[:len(worst)]
+
+def run_island(optimizer, seed, island, migration, migration_interval, time_budget_ms, local_search_interval,
+               results):
+    # A failed search is reported as (island, exception) so the parent re-raises it instead of waiting
+    try:
+        run = optimizer.search(np.random.default_rng(seed), migrate=migration,
+                               migration_interval=migration_interval, time_budget_ms=time_budget_ms,
+                               local_search_interval=local_search_interval)
+    except Exception as e:
+        run = e
+    finally:
+        migration.close()
+    results.put((island, run))
+
+def run_islands(optimizer, n_islands=4, migration_interval=10, topology="ring", migrants=1, seed=None,
+                time_budget_ms=None, local_search_interval=None, poll_s=1.0):
+    """
+    Island-model search: one sub-swarm per process, exchanging best particles every
+    migration_interval iterations. Returns the per-island search() results ordered by island.
+    An exception in any island (or an island process dying) is raised here and the other
+    islands are stopped.
+    """
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown migration topology '{topology}', expected one of {TOPOLOGIES}")
+    
+    ctx = mp.get_context()
+    inboxes = [ctx.Queue() for _ in range(n_islands)]
+    outgoing = [get_neighbours(i, n_islands, topology) for i in range(n_islands)]
+    senders = [[j for j in range(n_islands) if i in outgoing[j]] for i in range(n_islands)]
+    results = ctx.Queue()
+    seeds = np.random.SeedSequence(seed).spawn(n_islands)
+    
+    procs = []
+    for i in range(n_islands):
+        migration = IslandMigration(i, inboxes[i], [inboxes[j] for j in outgoing[i]], senders[i], migrants)
+        p = ctx.Process(
+            target=run_island,
+            args=(optimizer, seeds[i], i, migration, migration_interval, time_budget_ms, local_search_interval,
+                  results),
+            daemon=True
+        )
+        p.start()
+        procs.append(p)
+    
+    # Drain results before joining so no island blocks on a full queue
+    runs = [None] * n_islands
+    pending = set(range(n_islands))
+    dead = set()
+    try:
+        while pending:
+            try:
+                island, run = results.get(timeout=poll_s)
+            except queue.Empty:
+                # An island found dead on two polls in a row never reported (its result would
+                # have been in the pipe by then): crashed or killed
+                lost = dead & {i for i in pending if procs[i].exitcode is not None}
+                if lost:
+                    i = min(lost)
+                    raise RuntimeError(f"Island {i} exited with code {procs[i].exitcode} without a result")
+                dead = {i for i in pending if procs[i].exitcode is not None}
+                continue
+            if isinstance(run, BaseException):
+                raise run
+            runs[island] = run
+            pending.discard(island)
+    finally:
+        for p in procs:
+            if pending and p.is_alive():
+                p.terminate()
+        for p in procs:
+            p.join()
+    return runs
@@ -0,0 +1,182 @@
+import math
+import numpy as np
+from models.optimization.iqpso_sa import IQPSO_SA, haversine_km
+from models.optimization.local_search import two_opt_candidates
+
+def collapse_stops(orders):
+    # One stop per distinct coordinate: orders for the same place are delivered in one visit
+    df = orders.copy()
+    if "place_name" not in df.columns:
+        df["place_name"] = df["order_id"].astype(str)
+    if "quantity_kg" not in df.columns:
+        df["quantity_kg"] = 0.0
+    stops = df.groupby(["lat", "lon"], sort=False).agg(
+        place_name=("place_name", "first"),
+        order_ids=("order_id", lambda ids: ids.tolist()),
+        quantity_kg=("quantity_kg", "sum")
+    ).reset_index()
+    return stops
+
+def build_candidate_lists(lat, lon, k=8):
+    """
+    k nearest other stops of every stop from a BallTree on (lat, lon) with the haversine metric.
+    Returns (neighbors, neighbor_km), both (n, k); built in O(n log n).
+    """
+    from sklearn.neighbors import BallTree
+    coords = np.radians(np.column_stack([lat, lon]))
+    k = min(k, len(coords) - 1)
+    tree = BallTree(coords, metric="haversine")
+    dist, idx = tree.query(coords, k=k + 1)
+    # Column 0 is the stop itself
+    return idx[:, 1:], dist[:, 1:] * 6371.0
+
+class IQPSO_Large(IQPSO_SA):
+    """
+    Large-instance mode: one route over hundreds or thousands of stops placed by lat/lon.
+    No dense leg matrix is ever built. The swarm scores each route straight from
+    coordinates in O(n). Neighbourhood moves only use k-nearest candidate lists from a
+    spatial index: the relocation move in propose() and the 2-opt refinement of gbest.
+    That keeps the per-iteration cost near-linear in the number of stops.
+    The objective is cost only (distance * cost_per_km), as in the CVRP mode.
+    """
+    def __init__(self, orders, k_neighbors=8, num_particles=30, max_iter=100):
+        super().__init__(num_particles=num_particles, max_iter=max_iter)
+
+        self.stops = collapse_stops(orders)
+        self.locations = self.stops["place_name"].tolist()
+        self.dim = len(self.locations)
+        if self.dim < 2:
+            raise ValueError("Need at least two distinct stops")
+        self.lat = self.stops["lat"].to_numpy(dtype=float)
+        self.lon = self.stops["lon"].to_numpy(dtype=float)
+        self.rad_lat = np.radians(self.lat)
+        self.rad_lon = np.radians(self.lon)
+        self.cos_lat = np.cos(self.rad_lat)
+
+        self.neighbors, self.neighbor_km = build_candidate_lists(self.lat, self.lon, k_neighbors)
+
+        # Cost model
+        self.cost_per_km = 25.0
+        self.avg_speed_kmph = 30.0
+        # Share of particles that get a candidate-list relocation move per iteration
+        self.relocate_rate = 0.5
+
+        # Normalise by the greedy tour so objectives sit around 0.5-1.0 whatever the instance size
+        self.initial_tour = self.nearest_neighbour_tour()
+        greedy_km = float(self.route_km(self.initial_tour[None, :])[0])
+        self.max_cost = max(greedy_km * self.cost_per_km * 2.0, 1e-9)
+
+        # gbest refinement uses the candidate-list 2-opt
+        self.local_search_interval = 10
+
+    def route_km(self, perms):
+        # Route length of a batch of permutations (P, n) from coordinates, O(P * n)
+        return haversine_km(self.lat[perms[:, :-1]], self.lon[perms[:, :-1]],
+                            self.lat[perms[:, 1:]], self.lon[perms[:, 1:]]).sum(axis=1)
+
+    def edge_km(self, a, b):
+        # Scalar haversine for the local search inner loop
+        s1 = math.sin((self.rad_lat[b] - self.rad_lat[a]) / 2)
+        s2 = math.sin((self.rad_lon[b] - self.rad_lon[a]) / 2)
+        h = s1 * s1 + self.cos_lat[a] * self.cos_lat[b] * s2 * s2
+        return 2 * 6371.0 * math.asin(math.sqrt(min(h, 1.0)))
+
+    def nearest_neighbour_tour(self):
+        # Greedy tour from stop 0 through the candidate lists; falls back to a full scan only
+        # when every candidate of the current stop is already on the route
+        visited = np.zeros(self.dim, dtype=bool)
+        tour = [0]
+        visited[0] = True
+        for _ in range(self.dim - 1):
+            cur = tour[-1]
+            nxt = next((int(c) for c in self.neighbors[cur] if not visited[c]), None)
+            if nxt is None:
+                left = np.flatnonzero(~visited)
+                nxt = int(left[np.argmin(haversine_km(self.lat[cur], self.lon[cur], self.lat[left], self.lon[left]))])
+            tour.append(nxt)
+            visited[nxt] = True
+        return np.asarray(tour)
+
+    def prepare(self, start_time=None):
+        # Distances come from coordinates; there are no leg tensors to load
+        self.depart_minute = self.get_time_context(start_time)["depart_minute"]
+
+    def evaluate_batch(self, positions):
+        perms = np.argsort(positions, axis=1)
+        distance_km = self.route_km(perms)
+        total_cost = distance_km * self.cost_per_km
+        total_time = distance_km / self.avg_speed_kmph * 60.0
+        total_sat = np.zeros(len(positions))
+        return total_cost / self.max_cost, total_cost, total_sat, total_time
+
+    def propose(self, alpha, mbest):
+        x_new = super().propose(alpha, mbest)
+
+        # Relocation limited to candidate lists: stop i is moved right next to one of its
+        # k nearest neighbours j by giving it a position just beside x[j] (SPV order)
+        rows = np.flatnonzero(self.rng.random(len(x_new)) < self.relocate_rate)
+        if len(rows):
+            i = self.rng.integers(self.dim, size=len(rows))
+            j = self.neighbors[i, self.rng.integers(self.neighbors.shape[1], size=len(rows))]
+            side = np.where(self.rng.random(len(rows)) < 0.5, -1e-9, 1e-9)
+            x_new[rows, i] = x_new[rows, j] + side
+        return x_new
+
+    def refine_gbest(self):
+        perm = self.get_permutation(self.gbest)
+        new_perm, delta = two_opt_candidates(perm, self.edge_km, self.neighbors)
+        if delta >= 0:
+            return None
+        position = np.empty_like(self.gbest)
+        position[new_perm] = np.sort(self.gbest)
+        fit, c, s, t = self.evaluate(position)
+        if fit >= self.gbest_fitness:
+            return None
+        self.gbest = position
+        self.gbest_fitness = fit
+        return {"time": t, "cost": c, "sat": s}
+
+    def build_result(self, run, algorithm="Improved QPSO (SPV) + Simulated Annealing - large instance (k-NN candidate lists)"):
+        perm = self.get_permutation(run["gbest"])
+        best_metrics = run["best_metrics"]
+        route = [
+            {
+                "location": self.locations[i],
+                "lat": float(self.lat[i]),
+                "lon": float(self.lon[i]),
+                "orders": self.stops["order_ids"].iloc[i],
+                "quantity_kg": round(float(self.stops["quantity_kg"].iloc[i]), 2)
+            }
+            for i in perm
+        ]
+        return {
+            "algorithm": algorithm,
+            "num_stops": self.dim,
+            "num_orders": int(sum(len(o) for o in self.stops["order_ids"])),
+            "k_neighbors": int(self.neighbors.shape[1]),
+            "best_sequence": [self.locations[i] for i in perm],
+            "route": route,
+            "total_distance_km": round(best_metrics.get("cost", 0) / self.cost_per_km, 2),
+            "min_total_time": round(best_metrics.get("time", 0), 2),
+            "distribution_cost": round(best_metrics.get("cost", 0), 2),
+            "convergence": run["history"],
+            "metrics": {
+                "iterations": len(run["history"]),
+                "max_iter": self.max_iter,
+                "stop_reason": run["stop_reason"],
+                "elapsed_ms": round(run["elapsed_ms"], 2),
+                "final_objective": round(run["gbest_fitness"], 4)
+            }
+        }
+
+    def optimize(self, time_budget_ms=None, local_search_interval=None, on_iteration=None, seed_solution=None):
+        # Warm start from the greedy candidate-list tour unless a seed is given
+        if seed_solution is None:
+            seed_position = np.empty(self.dim)
+            seed_position[self.initial_tour] = np.linspace(-10, 10, self.dim)
+        else:
+            seed_position = self.seed_to_position(seed_solution)
+        self.prepare()
+        run = self.search(time_budget_ms=time_budget_ms, local_search_interval=local_search_interval,
+                          on_iteration=on_iteration, seed_position=seed_position)
+        return self.build_result(run)
@@ -0,0 +1,152 @@
+import numpy as np
+
+# Local search over an open route scored by a (possibly asymmetric) leg weight matrix W.
+# The route is closed with a virtual depot whose legs cost nothing, so 2-opt and Or-opt
+# work on a cycle without boundary cases. Every move is scored in O(1) from W and
+# prefix sums of the forward/backward leg weights along the current tour.
+
+def close_route(perm, W):
+    n = len(perm)
+    Wc = np.zeros((n + 1, n + 1))
+    Wc[:n, :n] = W
+    tour = np.concatenate([[n], perm]).astype(int)
+    return tour, Wc
+
+def prefix_costs(tour, Wc):
+    fwd = np.concatenate([[0.0], np.cumsum(Wc[tour[:-1], tour[1:]])])
+    bwd = np.concatenate([[0.0], np.cumsum(Wc[tour[1:], tour[:-1]])])
+    return fwd, bwd
+
+def two_opt_pass(tour, Wc):
+    # First-improvement 2-opt: reverse tour[i..j]. Reversing flips the direction of
+    # every inner leg, which the backward prefix sums price in O(1).
+    m = len(tour)
+    fwd, bwd = prefix_costs(tour, Wc)
+    for i in range(1, m - 1):
+        a = tour[i - 1]
+        for j in range(i + 1, m):
+            b = tour[(j + 1) % m]
+            delta = (Wc[a, tour[j]] + Wc[tour[i], b] - Wc[a, tour[i]] - Wc[tour[j], b]
+                     + (bwd[j] - bwd[i]) - (fwd[j] - fwd[i]))
+            if delta < -1e-12:
+                tour[i:j + 1] = tour[i:j + 1][::-1]
+                return True, delta
+    return False, 0.0
+
+def or_opt_pass(tour, Wc, max_segment=3):
+    # First-improvement Or-opt: move a segment of 1..max_segment stops (orientation kept)
+    # between two other consecutive stops.
+    m = len(tour)
+    for length in range(1, max_segment + 1):
+        for i in range(1, m - length + 1):
+            s0, sl = tour[i], tour[i + length - 1]
+            prev, nxt = tour[i - 1], tour[(i + length) % m]
+            removed = Wc[prev, s0] + Wc[sl, nxt] - Wc[prev, nxt]
+            for p in range(m):
+                if i - 1 <= p <= i + length - 1:
+                    continue
+                u, v = tour[p], tour[(p + 1) % m]
+                delta = Wc[u, s0] + Wc[sl, v] - Wc[u, v] - removed
+                if delta < -1e-12:
+                    segment = tour[i:i + length].copy()
+                    rest = np.concatenate([tour[:i], tour[i + length:]])
+                    insert_at = p + 1 if p < i else p + 1 - length
+                    tour[:] = np.concatenate([rest[:insert_at], segment, rest[insert_at:]])
+                    return True, delta
+    return False, 0.0
+
+def improve_route(perm, W, max_moves=1000):
+    """
+    Apply 2-opt and Or-opt moves to a permutation until no improving move is left
+    (or max_moves is reached). Returns (new_perm, total_delta).
+    """
+    if len(perm) < 3:
+        return np.asarray(perm), 0.0
+    tour, Wc = close_route(np.asarray(perm), W)
+    total = 0.0
+    for _ in range(max_moves):
+        moved, delta = two_opt_pass(tour, Wc)
+        if not moved:
+            moved, delta = or_opt_pass(tour, Wc)
+        if not moved:
+            break
+        total += delta
+    # Rotate so the virtual depot is first again, then drop it
+    start = int(np.where(tour == len(perm))[0][0])
+    tour = np.roll(tour, -start)
+    return tour[1:], total
+
+def two_opt_candidates(perm, dist, neighbors, max_moves=100000):
+    """
+    2-opt on an open route of a symmetric instance, restricted to candidate lists:
+    only moves that create an edge between a stop and one of its neighbors[a] are tried.
+    dist(a, b) prices a single edge. Stops touched by a move are re-queued (don't-look bits),
+    so a full improvement run costs roughly O(n * k) edge evaluations instead of O(n^2) per pass.
+    Returns (new_perm, total_delta).
+    """
+    tour = [int(v) for v in perm]
+    n = len(tour)
+    if n < 3:
+        return np.asarray(tour), 0.0
+    pos = {v: i for i, v in enumerate(tour)}
+
+    def edge(x, y):
+        # Edge between tour positions x and y; the open ends (-1, n) cost nothing
+        if x < 0 or y >= n:
+            return 0.0
+        return dist(tour[x], tour[y])
+
+    active = list(reversed(tour))
+    queued = set(tour)
+    total = 0.0
+    moves = 0
+    while active and moves < max_moves:
+        a = active.pop()
+        queued.discard(a)
+        for c in neighbors[a]:
+            i, j = pos[a], pos[int(c)]
+            # Edge (a, c) via a's successor side, or via a's predecessor side
+            for x, y in ((i, j), (i - 1, j - 1)):
+                lo, hi = min(x, y), max(x, y)
+                if hi - lo < 2:
+                    continue
+                delta = edge(lo, hi) + edge(lo + 1, hi + 1) - edge(lo, lo + 1) - edge(hi, hi + 1)
+                if delta < -1e-12:
+                    tour[lo + 1:hi + 1] = tour[lo + 1:hi + 1][::-1]
+                    for k in range(lo + 1, hi + 1):
+                        pos[tour[k]] = k
+                    for k in (lo, lo + 1, hi, hi + 1):
+                        if 0 <= k < n and tour[k] not in queued:
+                            queued.add(tour[k])
+                            active.append(tour[k])
+                    total += delta
+                    moves += 1
+                    break
+            else:
+                continue
+            break
+    return np.asarray(tour), total
+
+def two_opt_cycle(tour, D, max_moves=1000):
+    """
+    Best-improvement 2-opt on a closed tour of a symmetric instance, e.g. one vehicle route
+    with the depot at tour[0] (which stays first). Every reversal tour[i..j] is scored at once
+    from D per pass. Returns (new_tour, total_delta).
+    """
+    tour = np.asarray(tour).copy()
+    m = len(tour)
+    if m < 4:
+        return tour, 0.0
+    i, j = np.triu_indices(m, k=1)
+    keep = i >= 1
+    i, j = i[keep], j[keep]
+    total = 0.0
+    for _ in range(max_moves):
+        a, b = tour[i - 1], tour[(j + 1) % m]
+        delta = D[a, tour[j]] + D[tour[i], b] - D[a, tour[i]] - D[tour[j], b]
+        k = int(np.argmin(delta))
+        if delta[k] >= -1e-9:
+            break
+        tour[i[k]:j[k] + 1] = tour[i[k]:j[k] + 1][::-1]
+        total += float(delta[k])
+    return tour, total
@@ -0,0 +1,157 @@
+import time
+import numpy as np
+
+# Multi-objective mode: cost (minimise) vs satisfaction (maximise) kept apart instead of
+# collapsed by fixed w1/w2. Objectives are handled as (norm_cost, 1 - norm_sat), both minimised.
+
+def non_dominated(objectives):
+    # Mask of the non-dominated rows of an (n, 2) array: sort by the first objective,
+    # then a row survives if its second objective beats everything before it
+    order = np.lexsort((objectives[:, 1], objectives[:, 0]))
+    mask = np.zeros(len(objectives), dtype=bool)
+    best = np.inf
+    for i in order:
+        if objectives[i, 1] < best:
+            mask[i] = True
+            best = objectives[i, 1]
+    return mask
+
+def crowding_distance(objectives):
+    # NSGA-II crowding distance; boundary points get infinity so they are never pruned
+    n = len(objectives)
+    distance = np.zeros(n)
+    if n <= 2:
+        return np.full(n, np.inf)
+    for m in range(objectives.shape[1]):
+        order = np.argsort(objectives[:, m])
+        values = objectives[order, m]
+        span = values[-1] - values[0]
+        distance[order[0]] = distance[order[-1]] = np.inf
+        if span > 0:
+            distance[order[1:-1]] += (values[2:] - values[:-2]) / span
+    return distance
+
+def hypervolume(objectives, reference=(1.0, 1.0)):
+    # Area dominated by a 2-D front up to the reference point
+    front = objectives[non_dominated(objectives)]
+    front = front[np.argsort(front[:, 0])]
+    front = np.minimum(front, reference)
+    volume = 0.0
+    previous = reference[1]
+    for f1, f2 in front:
+        volume += (reference[0] - f1) * (previous - f2)
+        previous = f2
+    return float(volume)
+
+class ParetoArchive:
+    """
+    Bounded archive of non-dominated solutions. When it grows past max_size the most
+    crowded member is dropped (one at a time, re-scoring after each drop) so the
+    front keeps its spread.
+    """
+    def __init__(self, max_size=50):
+        self.max_size = max_size
+        self.objectives = None
+        self.positions = None
+        self.metrics = None  # (cost, sat, time) per member
+
+    def update(self, objectives, positions, metrics):
+        if self.objectives is not None:
+            objectives = np.vstack([self.objectives, objectives])
+            positions = np.vstack([self.positions, positions])
+            metrics = np.vstack([self.metrics, metrics])
+
+        # Different positions often decode to the same route: keep one per objective pair
+        _, unique = np.unique(np.round(objectives, 12), axis=0, return_index=True)
+        keep = unique[non_dominated(objectives[unique])]
+        objectives, positions, metrics = objectives[keep], positions[keep], metrics[keep]
+
+        while len(objectives) > self.max_size:
+            drop = int(np.argmin(crowding_distance(objectives)))
+            objectives = np.delete(objectives, drop, axis=0)
+            positions = np.delete(positions, drop, axis=0)
+            metrics = np.delete(metrics, drop, axis=0)
+
+        self.objectives, self.positions, self.metrics = objectives, positions, metrics
+
+    def leaders(self, weights):
+        # For each particle, the member that is best under that particle's own weighting
+        scores = weights @ self.objectives.T
+        return self.positions[np.argmin(scores, axis=1)]
+
+    def __len__(self):
+        return 0 if self.objectives is None else len(self.objectives)
+
+def split_objectives(optimizer, positions):
+    _, cost, sat, total_time = optimizer.evaluate_batch(positions)
+    objectives = np.column_stack([cost / optimizer.max_cost, 1.0 - (sat / optimizer.max_sat)])
+    return objectives, np.column_stack([cost, sat, total_time])
+
+def run_pareto(optimizer, archive_size=50, time_budget_ms=None, on_iteration=None, rng=None):
+    """
+    One QPSO + SA run that fills a Pareto archive. Each particle keeps its own fixed weighting
+    (spread evenly from cost-only to satisfaction-only) for its pbest and SA acceptance, and is
+    attracted to the archive member that is best under that weighting instead of a single gbest.
+    Every evaluated position is offered to the archive. Stops on max_iter, the time budget, or
+    when the archive hypervolume stalls for stall_window iterations.
+    """
+    if rng is not None:
+        optimizer.rng = rng
+    if time_budget_ms is None:
+        time_budget_ms = optimizer.time_budget_ms
+    start = time.perf_counter()
+    stop_reason = "max_iter"
+
+    n = optimizer.num_particles
+    lam = np.linspace(0.0, 1.0, n)
+    weights = np.column_stack([lam, 1.0 - lam])
+
+    optimizer.initialize()
+    archive = ParetoArchive(archive_size)
+    temp = optimizer.initial_temp
+    history = []
+
+    for it in range(1, optimizer.max_iter + 1):
+        alpha = optimizer.alpha_start - ((optimizer.alpha_start - optimizer.alpha_end) * (it / optimizer.max_iter))
+
+        objectives, metrics = split_objectives(optimizer, optimizer.particles)
+        current = np.sum(weights * objectives, axis=1)
+        improved = current < optimizer.pbest_fitness
+        optimizer.pbest[improved] = optimizer.particles[improved]
+        optimizer.pbest_fitness[improved] = current[improved]
+        archive.update(objectives, optimizer.particles, metrics)
+
+        # Per-particle leaders broadcast through the usual QPSO update
+        optimizer.gbest = archive.leaders(weights)
+        mbest = np.mean(optimizer.pbest, axis=0)
+        x_new = optimizer.propose(alpha, mbest)
+
+        new_objectives, new_metrics = split_objectives(optimizer, x_new)
+        archive.update(new_objectives, x_new, new_metrics)
+        delta = np.sum(weights * new_objectives, axis=1) - current
+        prob = np.exp(-np.maximum(delta, 0) / (temp + 1e-9))
+        accepted = (delta < 0) | (optimizer.rng.random(n) < prob)
+        optimizer.particles[accepted] = x_new[accepted]
+
+        temp *= optimizer.cooling_rate
+        history.append(hypervolume(archive.objectives))
+        if on_iteration is not None:
+            on_iteration(it, history[-1])
+
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        if time_budget_ms is not None and elapsed_ms >= time_budget_ms:
+            stop_reason = "time_budget"
+            break
+        if optimizer.stall_window and len(history) > optimizer.stall_window:
+            previous = history[-optimizer.stall_window - 1]
+            if (history[-1] - previous) <= optimizer.stall_tol * max(abs(previous), 1e-12):
+                stop_reason = "converged"
+                break
+
+    optimizer.gbest = None
+    return {
+        "archive": archive,
+        "history": history,
+        "stop_reason": stop_reason,
+        "elapsed_ms": (time.perf_counter() - start) * 1000.0
+    }
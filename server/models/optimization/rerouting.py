@@ -0,0 +1,276 @@
+import queue
+import threading
+import time
+from datetime import datetime
+
+
+class ReroutingService:
+    """
+    Rolling-horizon re-routing. Keeps a live plan per vehicle and, when an event touches a
+    vehicle (new order, traffic or weather change on one of its remaining stops), re-optimizes
+    only the unvisited suffix of that route, warm-started from the current order and bounded
+    by replan_budget_ms. Events are handled on one background thread; events queued while a
+    re-plan runs are coalesced so each affected vehicle is re-planned once.
+    """
+    def __init__(self, optimizer, replan_budget_ms=250.0, watch_interval_s=300.0,
+                 traffic_threshold=0.15, rain_threshold_mm=2.0):
+        self.optimizer = optimizer
+        self.replan_budget_ms = replan_budget_ms
+        self.watch_interval_s = watch_interval_s  # how often predictions are re-checked
+        self.traffic_threshold = traffic_threshold  # relative change in remaining travel time
+        self.rain_threshold_mm = rain_threshold_mm  # change in predicted rain at a remaining stop
+        self.plans = {}
+        self.events = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.running = False
+        self.stats = {"events": 0, "replans": 0, "replan_ms": 0.0}
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="rerouting", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.events.put(None)
+        if self.thread is not None:
+            self.thread.join(timeout=5.0)
+        self.thread = None
+
+    # --- Plans ---
+
+    def create_plan(self, vehicle_id, stops, start_time=None):
+        # Initial plan over all stops; the first stop given is where the vehicle starts
+        if not stops:
+            raise ValueError("A plan needs at least one stop")
+        duplicates = sorted({loc for loc in stops if stops.count(loc) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate stops: {duplicates}")
+        sub = self.optimizer.subproblem(stops[1:], start=stops[0])
+        result = sub.optimize(time_budget_ms=self.replan_budget_ms, start_time=start_time, use_cache=False,
+                              seed_solution=stops)
+        plan = {
+            "vehicle_id": vehicle_id,
+            "route": result["best_sequence"],
+            "visited": 1,  # the start counts as visited
+            "start_time": start_time,
+            "objective": result["metrics"]["final_objective"],
+            "total_time": result["min_total_time"],
+            "version": 1,
+            "updated_at": time.time(),
+            "replans": []
+        }
+        plan["snapshot"] = self.snapshot(plan)
+        with self.lock:
+            self.plans[vehicle_id] = plan
+        return self.get_plan(vehicle_id)
+
+    def get_plan(self, vehicle_id):
+        with self.lock:
+            plan = self.plans.get(vehicle_id)
+            if plan is None:
+                return None
+            plan = dict(plan)
+        plan["remaining"] = plan["route"][plan["visited"]:]
+        plan["replans"] = list(plan["replans"])
+        plan.pop("snapshot", None)
+        return plan
+
+    def list_plans(self):
+        with self.lock:
+            vehicle_ids = list(self.plans)
+        return [self.get_plan(v) for v in vehicle_ids]
+
+    def mark_visited(self, vehicle_id, location):
+        # The vehicle reached location: everything up to it in the route is now fixed
+        with self.lock:
+            plan = self.plans.get(vehicle_id)
+            if plan is None:
+                raise KeyError(vehicle_id)
+            if location not in plan["route"][plan["visited"] - 1:]:
+                raise ValueError(f"{location} is not on the remaining route of {vehicle_id}")
+            plan["visited"] = plan["route"].index(location, plan["visited"] - 1) + 1
+            plan["updated_at"] = time.time()
+        return self.get_plan(vehicle_id)
+
+    # --- Events ---
+
+    def add_order(self, vehicle_id, location):
+        # Checked here: an unknown stop appended to the route would make every later re-plan fail
+        if location not in self.optimizer.universe:
+            raise ValueError(f"Unknown location: {location}")
+        with self.lock:
+            plan = self.plans.get(vehicle_id)
+            if plan is None:
+                raise KeyError(vehicle_id)
+            if location in plan["route"][:plan["visited"]]:
+                raise ValueError(f"{location} was already visited or is the current stop of {vehicle_id}")
+        self.push({"type": "order", "vehicle_id": vehicle_id, "location": location})
+
+    def report_conditions(self, locations, reason="traffic"):
+        # External feeds (e.g. a TomTom flow poller) report a change around these locations
+        self.push({"type": "conditions", "locations": list(locations), "reason": reason})
+
+    def push(self, event):
+        with self.lock:
+            self.stats["events"] += 1
+        self.events.put(event)
+
+    def run(self):
+        last_watch = time.monotonic()
+        while self.running:
+            try:
+                event = self.events.get(timeout=self.watch_interval_s)
+            except queue.Empty:
+                event = {"type": "watch"}
+            if event is None:
+                break
+
+            # Coalesce everything that queued up into one set of affected vehicles
+            batch = [event]
+            while True:
+                try:
+                    event = self.events.get_nowait()
+                except queue.Empty:
+                    break
+                if event is None:
+                    self.running = False
+                    break
+                batch.append(event)
+
+            if time.monotonic() - last_watch >= self.watch_interval_s:
+                batch.append({"type": "watch"})
+            try:
+                affected = self.apply_events(batch)
+                if any(e["type"] == "watch" for e in batch):
+                    last_watch = time.monotonic()
+                    affected.update(self.check_conditions())
+                for vehicle_id, reason in affected.items():
+                    self.replan(vehicle_id, reason)
+            except Exception as e:
+                print(f"Error in re-routing loop: {e}")
+
+    def apply_events(self, batch):
+        # Returns {vehicle_id: reason} for every plan the events touch
+        affected = {}
+        with self.lock:
+            for event in batch:
+                if event["type"] == "order":
+                    # Already pending is a no-op; visited since add_order checked it is dropped too,
+                    # since a stop must not appear twice in a route
+                    plan = self.plans.get(event["vehicle_id"])
+                    if plan is not None and event["location"] not in plan["route"]:
+                        plan["route"].append(event["location"])
+                        plan["version"] += 1
+                        affected[plan["vehicle_id"]] = "new_order"
+                elif event["type"] == "conditions":
+                    for vehicle_id, plan in self.plans.items():
+                        if set(event["locations"]) & set(plan["route"][plan["visited"] - 1:]):
+                            affected.setdefault(vehicle_id, event["reason"])
+                elif event["type"] == "replan":
+                    affected.setdefault(event["vehicle_id"], event["reason"])
+        return affected
+
+    # --- Condition watching ---
+
+    def snapshot(self, plan):
+        # Predictions the current plan was made with: remaining travel time and rain per remaining stop
+        remaining = plan["route"][plan["visited"] - 1:]
+        snapshot = {"total_time": None, "rain_mm": {}}
+        if len(remaining) < 2:
+            return snapshot
+
+        sub = self.optimizer.subproblem(remaining[1:], start=remaining[0])
+        sub.prepare()
+        _, _, _, total_time = sub.evaluate(sub.seed_to_position(remaining))
+        snapshot["total_time"] = total_time
+
+        try:
+            from models.weather_analyzer import weather_analyzer
+            ctx = sub.get_time_context()
+            hour = ctx["depart_minute"] // 60
+            for loc in remaining[1:]:
+                pred = weather_analyzer.predict(loc, hour, ctx["season"])
+                if pred is not None:
+                    snapshot["rain_mm"][loc] = pred["rain_mm"]
+        except Exception as e:
+            print(f"Error predicting weather for re-routing: {e}")
+        return snapshot
+
+    def check_conditions(self):
+        # Re-score every live plan with fresh predictions; plans whose remaining travel time or
+        # rain outlook moved past the thresholds are re-planned
+        with self.lock:
+            plans = [dict(p) for p in self.plans.values()]
+        affected = {}
+        for plan in plans:
+            before = plan["snapshot"]
+            if before["total_time"] is None:
+                continue
+            now = self.snapshot(plan)
+            change = abs(now["total_time"] - before["total_time"]) / max(before["total_time"], 1e-9)
+            if change > self.traffic_threshold:
+                affected[plan["vehicle_id"]] = "traffic"
+                continue
+            for loc, rain in now["rain_mm"].items():
+                if abs(rain - before["rain_mm"].get(loc, rain)) > self.rain_threshold_mm:
+                    affected[plan["vehicle_id"]] = "weather"
+                    break
+        return affected
+
+    # --- Re-planning ---
+
+    def replan(self, vehicle_id, reason):
+        with self.lock:
+            plan = self.plans.get(vehicle_id)
+            if plan is None:
+                return None
+            route = list(plan["route"])
+            visited = plan["visited"]
+            version = plan["version"]
+
+        # Only the suffix after the vehicle's current stop is open; the current stop is pinned first
+        current, suffix = route[visited - 1], route[visited:]
+        if len(suffix) < 2:
+            new_route, result = route, None
+        else:
+            sub = self.optimizer.subproblem(suffix, start=current)
+            result = sub.optimize(time_budget_ms=self.replan_budget_ms, use_cache=False,
+                                  start_time=datetime.now().strftime("%H:%M"), seed_solution=[current] + suffix)
+            new_route = route[:visited] + result["best_sequence"][1:]
+
+        with self.lock:
+            plan = self.plans.get(vehicle_id)
+            if plan is None:
+                return None
+            # The vehicle moved on while we were searching: try again from its new position
+            if plan["version"] != version or plan["visited"] != visited:
+                # push() takes the lock we already hold
+                self.stats["events"] += 1
+                self.events.put({"type": "replan", "vehicle_id": vehicle_id, "reason": reason})
+                return None
+            plan["route"] = new_route
+            plan["version"] += 1
+            plan["updated_at"] = time.time()
+            if result is not None:
+                plan["objective"] = result["metrics"]["final_objective"]
+                plan["total_time"] = result["min_total_time"]
+                self.stats["replans"] += 1
+                self.stats["replan_ms"] += result["metrics"]["elapsed_ms"]
+            plan["replans"].append({
+                "reason": reason,
+                "at": plan["updated_at"],
+                "stops_replanned": len(suffix),
+                "elapsed_ms": result["metrics"]["elapsed_ms"] if result is not None else 0.0
+            })
+            del plan["replans"][:-20]
+            snapshot_plan = dict(plan)
+
+        snapshot = self.snapshot(snapshot_plan)
+        with self.lock:
+            if plan["version"] == snapshot_plan["version"]:
+                plan["snapshot"] = snapshot
+        return self.get_plan(vehicle_id)
@@ -0,0 +1,144 @@
+import os
+import threading
+import numpy as np
+
+VEHICLE_DATA_PATH = 'models/data/data_sets/vehicle_data.csv'
+COLUMNS = ['vehicle_id', 'fuel_type', 'fuel_efficiency_l100km', 'max_load_kg',
+           'cooling_efficiency_percent', 'service_area']
+
+# Running cost per km: litres/100 km x price for liquid fuels, a flat rate for electric
+FUEL_PRICE_PER_L = {"Diesel": 90.0, "Hybrid": 100.0, "Petrol": 100.0, "CNG": 80.0}
+ELECTRIC_COST_PER_KM = 8.0
+
+class VehiclePool:
+    """
+    Column-oriented fleet registry loaded from vehicle_data.csv on first use (so server startup
+    does not grow with the fleet). Rows are indexed by service_area and fuel_type (row-index
+    arrays per value) and sorted by cooling efficiency for threshold queries.
+    Stops are matched to distinct vehicles with one Hungarian solve (scipy linear_sum_assignment)
+    over fuel cost, cooling efficiency and capacity fit.
+    """
+    def __init__(self, path=VEHICLE_DATA_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.loaded = False
+
+        # Assignment cost weights (INR-equivalents)
+        self.cooling_weight = 5.0   # per percentage point of cooling efficiency below 100
+        self.capacity_weight = 50.0 # per unit of unused capacity share (oversized vehicle)
+        self.unassigned_cost = 1e9
+
+    def load(self):
+        with self.lock:
+            if self.loaded:
+                return
+            import pandas as pd
+            path = self.path
+            if not os.path.exists(path):
+                path = os.path.join('server', path)
+            try:
+                vdf = pd.read_csv(path, usecols=COLUMNS)
+            except Exception as e:
+                print(f"Error loading vehicle pool: {e}")
+                vdf = pd.DataFrame({c: [] for c in COLUMNS})
+
+            self.vehicle_id = vdf['vehicle_id'].to_numpy(dtype=object)
+            self.fuel_type = vdf['fuel_type'].to_numpy(dtype=object)
+            self.max_load_kg = vdf['max_load_kg'].to_numpy(dtype=float)
+            self.cooling = vdf['cooling_efficiency_percent'].to_numpy(dtype=float)
+            self.service_area = vdf['service_area'].to_numpy(dtype=object)
+
+            price = vdf['fuel_type'].map(FUEL_PRICE_PER_L).fillna(0.0).to_numpy(dtype=float)
+            self.fuel_cost_per_km = np.where(
+                vdf['fuel_type'].to_numpy() == "Electric",
+                ELECTRIC_COST_PER_KM,
+                vdf['fuel_efficiency_l100km'].to_numpy(dtype=float) / 100.0 * price
+            )
+
+            self.by_area = {k: np.asarray(v) for k, v in vdf.groupby('service_area').indices.items()}
+            self.by_fuel = {k: np.asarray(v) for k, v in vdf.groupby('fuel_type').indices.items()}
+            self.cooling_order = np.argsort(self.cooling, kind="stable")
+            self.cooling_sorted = self.cooling[self.cooling_order]
+            self.loaded = True
+
+    def __len__(self):
+        self.load()
+        return len(self.vehicle_id)
+
+    def candidates(self, service_area=None, fuel_type=None, min_cooling=None, min_load_kg=None):
+        # Row indices matching every given filter, from the indexes (no full scans except min_load_kg)
+        self.load()
+        rows = np.arange(len(self.vehicle_id))
+        if service_area is not None:
+            rows = self.by_area.get(service_area, np.empty(0, dtype=int))
+        if fuel_type is not None:
+            rows = np.intersect1d(rows, self.by_fuel.get(fuel_type, np.empty(0, dtype=int)), assume_unique=True)
+        if min_cooling is not None:
+            start = np.searchsorted(self.cooling_sorted, min_cooling, side="left")
+            rows = np.intersect1d(rows, self.cooling_order[start:], assume_unique=True)
+        if min_load_kg is not None:
+            rows = rows[self.max_load_kg[rows] >= min_load_kg]
+        return rows
+
+    def vehicle(self, row):
+        return {
+            "vehicle_id": self.vehicle_id[row],
+            "fuel_type": self.fuel_type[row],
+            "max_load_kg": float(self.max_load_kg[row]),
+            "cooling_efficiency_percent": float(self.cooling[row]),
+            "service_area": self.service_area[row]
+        }
+
+    def stop_costs(self, stop, rows):
+        # Cost of serving one stop with each vehicle in rows; infeasible vehicles get unassigned_cost
+        load = stop.get("load_kg") or 0.0
+        cost = (self.fuel_cost_per_km[rows] * (stop.get("distance_km") or 0.0)
+                + self.cooling_weight * (100.0 - self.cooling[rows])
+                + self.capacity_weight * np.clip(1.0 - load / self.max_load_kg[rows], 0.0, 1.0))
+        infeasible = self.max_load_kg[rows] < load
+        if stop.get("min_cooling") is not None:
+            infeasible |= self.cooling[rows] < stop["min_cooling"]
+        return np.where(infeasible, self.unassigned_cost, cost)
+
+    def assign(self, stops):
+        """
+        stops: [{"location", "distance_km"?, "load_kg"?, "min_cooling"?}]. Each stop is served by
+        a distinct vehicle from its location's service area (the whole fleet if the area has none).
+        Only the len(stops) cheapest vehicles of each stop enter the cost matrix, which keeps the
+        solve small and still guarantees a full matching (Hall's condition). Returns one dict
+        per stop with the vehicle fields and the assignment cost, or vehicle_id "VH-GEN".
+        """
+        from scipy.optimize import linear_sum_assignment
+        self.load()
+        n = len(stops)
+        if n == 0:
+            return []
+
+        per_stop = []
+        for stop in stops:
+            rows = self.candidates(service_area=stop.get("location"))
+            if len(rows) == 0:
+                rows = np.arange(len(self.vehicle_id))
+            costs = self.stop_costs(stop, rows)
+            if len(rows) > n:
+                keep = np.argpartition(costs, n - 1)[:n]
+                rows, costs = rows[keep], costs[keep]
+            per_stop.append((rows, costs))
+
+        columns = np.unique(np.concatenate([rows for rows, _ in per_stop]))
+        if len(columns) == 0:
+            return [{"location": s.get("location"), "vehicle_id": "VH-GEN"} for s in stops]
+        matrix = np.full((n, len(columns)), self.unassigned_cost)
+        for i, (rows, costs) in enumerate(per_stop):
+            matrix[i, np.searchsorted(columns, rows)] = costs
+
+        stop_idx, col_idx = linear_sum_assignment(matrix)
+        assignment = [{"location": s.get("location"), "vehicle_id": "VH-GEN"} for s in stops]
+        for i, j in zip(stop_idx, col_idx):
+            if matrix[i, j] >= self.unassigned_cost:
+                continue
+            assignment[i].update(self.vehicle(columns[j]))
+            assignment[i]["assignment_cost"] = round(float(matrix[i, j]), 2)
+        return assignment
+
+vehicle_pool = VehiclePool()
@@ -61,6 +61,42 @@ class ResultsAnalyzer:
             print(f"Open-Meteo API Error: {e}")
         return None
 
+    def season_for(self, month):
+        if 3 <= month <= 5: return "Summer"
+        elif 6 <= month <= 9: return "Monsoon"
+        return "Winter"
+
+    def is_peak_hour(self, hour):
+        # Works on an int hour or a pandas Series of hours (elementwise)
+        return ((8 <= hour) & (hour <= 11)) | ((17 <= hour) & (hour <= 21))
+
+    def predicted_rain(self, route_name, hour, season):
+        weather_pred = self.weather_analyzer.predict(route_name, hour, season)
+        return max(0, weather_pred['rain_mm']) if weather_pred else 0.0
+
+    def traffic_estimate(self, prediction, range_km):
+        # (traffic_index, travel time, cost, satisfaction) from the traffic LSTM, or defaults
+        # (30 km/h average speed) when it has no prediction
+        if prediction is not None:
+            return tuple(float(v) for v in prediction)
+        return 50.0, (range_km / 30.0) * 60, 0.0, 5.0
+
+    def delivery_result(self, route_name, range_km, estimate, rain_mm):
+        pred_index, pred_time, pred_cost, pred_sat = estimate
+        return {
+            "route": route_name,
+            "distance_km": range_km,
+            "predicted_traffic_index": round(pred_index, 1),
+            "predicted_rain_mm": round(rain_mm, 1),
+            "estimated_delivery_time_mins": int(pred_time),
+            "predicted_cost": round(pred_cost, 2),
+            "predicted_satisfaction": round(pred_sat, 2),
+            "conditions": {
+                "congestion": "High" if pred_index > 60 else "Low",
+                "weather": "Rainy" if rain_mm > 0.5 else "Clear"
+            }
+        }
+
     def analyze_delivery(self, route_name, start_time_str, range_km):
         """
         Predict delivery time based on LSTM Traffic and Weather models AND Validate with Real-time APIs.
@@ -69,38 +105,22 @@ class ResultsAnalyzer:
             # 1. Parse Time Context
             dt = datetime.now() 
             day_name = dt.strftime("%A")
-            month = dt.month
-            
-            if 3 <= month <= 5: season = "Summer"
-            elif 6 <= month <= 9: season = "Monsoon"
-            else: season = "Winter"
+            season = self.season_for(dt.month)
             
             hour = int(start_time_str.split(":")[0])
             
             
             # 2. Get Weather Prediction (LSTM)
-            weather_pred = self.weather_analyzer.predict(route_name, hour, season)
-            lstm_rain_mm = 0
-            if weather_pred:
-                lstm_rain_mm = max(0, weather_pred['rain_mm'])
+            lstm_rain_mm = self.predicted_rain(route_name, hour, season)
             
             # 3. Get Traffic Prediction (LSTM)
-            is_peak = 1 if (8 <= hour <= 11) or (17 <= hour <= 21) else 0
+            is_peak = int(self.is_peak_hour(hour))
             
             # Predict
             # Returns (traffic_index, currentTravelTime) or None
             prediction_result = self.traffic_analyzer.predict(route_name, start_time_str, day_name, season, is_peak, range_km)
-            
-            if prediction_result:
-                pred_index, pred_time, pred_cost, pred_sat = prediction_result
-            else:
-                pred_time = (range_km / 30.0) * 60
-                pred_index = 50.0
-                pred_cost = 0.0
-                pred_sat = 5.0
-
-            lstm_estimated_time_mins = pred_time
-            traffic_index = pred_index
+            estimate = self.traffic_estimate(prediction_result, range_km)
+            lstm_estimated_time_mins = estimate[1]
             
             
             real_time_metrics = {}
@@ -140,25 +160,14 @@ class ResultsAnalyzer:
                     
                     accuracy_metrics["rain_diff_mm"] = round(lstm_rain_mm - weather_data["rain_mm"], 2)
 
-            return {
-                "route": route_name,
-                "distance_km": range_km,
-                "predicted_traffic_index": round(traffic_index, 1),
-                "predicted_rain_mm": round(lstm_rain_mm, 1),
-                "estimated_delivery_time_mins": int(lstm_estimated_time_mins),
-                "predicted_cost": round(pred_cost, 2),
-                "predicted_satisfaction": round(pred_sat, 2),
-                "conditions": {
-                    "congestion": "High" if traffic_index > 60 else "Low",
-                    "weather": "Rainy" if lstm_rain_mm > 0.5 else "Clear"
-                },
-                "real_time_validation": {
-                    "available": bool(flow_data),
-                    "metrics": real_time_metrics,
-                    "accuracy": accuracy_metrics,
-                    "raw_data": raw_json_data
-                }
+            result = self.delivery_result(route_name, range_km, estimate, lstm_rain_mm)
+            result["real_time_validation"] = {
+                "available": bool(flow_data),
+                "metrics": real_time_metrics,
+                "accuracy": accuracy_metrics,
+                "raw_data": raw_json_data
             }
+            return result
             
         except Exception as e:
             print(f"Analysis Error: {e}")
@@ -166,4 +175,54 @@ class ResultsAnalyzer:
             traceback.print_exc()
             return {"error": str(e)}
 
+    def predict_deliveries(self, deliveries):
+        """
+        LSTM-only estimates for many deliveries at once: one traffic forward pass for all rows and
+        one weather prediction per distinct (route, hour). No real-time API calls.
+        deliveries: [{"route_name", "range_km", "start_time"?, plus optional vehicle attributes}]
+        Raises ValueError naming the deliveries with an invalid start_time or a route the model
+        does not know.
+        """
+        import pandas as pd
+        from models.traffic_analyzer import VEHICLE_FEATURES
+        if not deliveries:
+            return []
+
+        dt = datetime.now()
+        season = self.season_for(dt.month)
+
+        df = pd.DataFrame(deliveries)
+        if "start_time" not in df.columns:
+            df["start_time"] = None
+        df["time"] = df["start_time"].fillna(dt.strftime("%H:%M"))
+        df["route"] = df["route_name"]
+        df["day"] = dt.strftime("%A")
+        df["season"] = season
+        hours = self.traffic_analyzer.parse_hours(df["time"])
+        bad_time = np.isnan(hours)
+        if bad_time.any():
+            raise ValueError(f"Invalid start_time for deliveries {np.flatnonzero(bad_time).tolist()} (expected HH:MM)")
+        hour = pd.Series(np.floor(hours).astype(int))
+        df["is_peak"] = self.is_peak_hour(hour).astype(int)
+        for col, default in VEHICLE_FEATURES.items():
+            if col in df.columns:
+                df[col] = df[col].fillna(default)
+
+        predictions = self.traffic_analyzer.predict_many(df)
+        if predictions is not None:
+            unknown = np.isnan(predictions).any(axis=1)
+            if unknown.any():
+                raise ValueError(f"Unknown route for deliveries {np.flatnonzero(unknown).tolist()}: "
+                                 f"{sorted(set(df['route'][unknown].astype(str)))}")
+
+        rain = {key: self.predicted_rain(key[0], int(key[1]), season) for key in set(zip(df["route"], hour))}
+
+        results = []
+        for i, row in df.iterrows():
+            estimate = self.traffic_estimate(predictions[i] if predictions is not None else None, row["range_km"])
+            result = self.delivery_result(row["route"], row["range_km"], estimate, rain[(row["route"], hour[i])])
+            result["start_time"] = row["time"]
+            results.append(result)
+        return results
+
 results_analyzer = ResultsAnalyzer()
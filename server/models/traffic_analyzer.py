@@ -1,25 +1,35 @@
 import pandas as pd
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
-from sklearn.preprocessing import MinMaxScaler, LabelEncoder
-from sklearn.model_selection import train_test_split
-import joblib
 import os
+from models.cache_utils import TTLCache
+from models.lstm_analyzer import LSTMAnalyzer
+
+# Vehicle attributes the model was trained with, and the averages used when a row has none
+VEHICLE_FEATURES = {
+    'fuel_efficiency_l100km': 15.0,
+    'cooling_efficiency_percent': 95.0,
+    'years_in_service': 5.0,
+    'max_load_kg': 8000.0
+}
+
+class TrafficAnalyzer(LSTMAnalyzer):
+    default_epochs = 20
+    # Features: route, hour, day, season, is_peak, range_km, freeFlowSpeed + Vehicle Attributes
+    categorical_columns = ['route', 'day_of_the_week', 'season', 'most_probable_vehicle_type']
+    feature_columns = ['route', 'hour', 'day_of_the_week', 'season', 'is_peak', 'range_km', 'freeFlowSpeed',
+                       'fuel_efficiency_l100km', 'cooling_efficiency_percent', 'years_in_service', 'max_load_kg']
+    target_columns = ['traffic_index', 'currentTravelTime', 'distribution_cost', 'customer_satisfaction']
 
-class TrafficAnalyzer:
     def __init__(self, data_path='models/data/data_sets/hyderabad_traffic_data.csv'):
-        self.data_path = data_path
-        self.model = None
-        self.scaler_X = MinMaxScaler()
-        self.scaler_y = MinMaxScaler()
-        self.label_encoders = {}
-        self.model_path = 'models/saved/traffic_lstm.keras'
-        self.encoders_path = 'models/saved/traffic_encoders.pkl'
-        
-        # Ensure saved directory exists
-        os.makedirs('models/saved', exist_ok=True)
+        super().__init__('traffic', data_path)
+        
+        # predict() cache keyed by the raw inputs, with the time quantized to time_bucket_minutes;
+        # flushed when the model or encoders on disk change. predict_many is not cached
+        self.time_bucket_minutes = 5
+        self.prediction_cache = TTLCache(
+            max_size=8192, ttl_seconds=900.0,
+            watch_paths=(self.model_path, self.encoders_path)
+        )
 
     def load_data(self):
         if not os.path.exists(self.data_path):
@@ -49,46 +59,20 @@ class TrafficAnalyzer:
             print(f"Warning: Could not merge vehicle data: {e}")
             return traffic_df
 
-    def preprocess(self, df):
-        # Feature Engineering
+    def add_features(self, df):
         # Convert time string to hour float (fractional for better precision)
         time_dt = pd.to_datetime(df['time_start'], format='%H:%M:%S')
         df['hour'] = time_dt.dt.hour + (time_dt.dt.minute / 60.0)
-        
-        # Encode categorical variables
-        categorical_cols = ['route', 'day_of_the_week', 'season', 'most_probable_vehicle_type']
-        for col in categorical_cols:
-            le = LabelEncoder()
-            df[col] = le.fit_transform(df[col])
-            self.label_encoders[col] = le
-            
-        # Select Features and Target
-        # Features: route, hour, day, season, is_peak, range_km, freeFlowSpeed + Vehicle Attributes
-        # Vehicle Attributes to include: fuel_efficiency_l100km, cooling_efficiency_percent, years_in_service, max_load_kg
-        
-        # Ensure new columns exist (handle case if vehicle merge failed)
-        new_features = ['fuel_efficiency_l100km', 'cooling_efficiency_percent', 'years_in_service', 'max_load_kg']
-        for feat in new_features:
+        # Ensure vehicle columns exist (handle case if vehicle merge failed)
+        for feat in VEHICLE_FEATURES:
             if feat not in df.columns:
                 df[feat] = 0.0 # Default fallback
-        
-        features = ['route', 'hour', 'day_of_the_week', 'season', 'is_peak', 'range_km', 'freeFlowSpeed', 
-                    'fuel_efficiency_l100km', 'cooling_efficiency_percent', 'years_in_service', 'max_load_kg']
-        target = ['traffic_index', 'currentTravelTime', 'distribution_cost', 'customer_satisfaction']
-        
-        X = df[features].values
-        y = df[target].values
-        
-        # Scale data
-        X_scaled = self.scaler_X.fit_transform(X)
-        y_scaled = self.scaler_y.fit_transform(y)
-        
-        # Reshape for LSTM [samples, time steps, features]
-        X_reshaped = X_scaled.reshape((X_scaled.shape[0], 1, X_scaled.shape[1]))
-        
-        return X_reshaped, y_scaled, features
 
     def build_model(self, input_shape):
+        # TensorFlow is only needed for training; serving goes through models.inference
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import LSTM, Dense, Dropout
+        
         model = Sequential()
         model.add(LSTM(64, return_sequences=True, input_shape=input_shape))
         model.add(Dropout(0.2))
@@ -100,44 +84,14 @@ class TrafficAnalyzer:
         model.compile(optimizer='adam', loss='mse', metrics=['mae'])
         return model
 
-    def train_model(self, epochs=20, batch_size=32):
-        print("Loading and preprocessing traffic data...")
-        df = self.load_data()
-        X, y, feature_names = self.preprocess(df)
-        
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        
-        print(f"Building LSTM Model with input shape {X.shape[1:]}...")
-        self.model = self.build_model(X.shape[1:])
-        
-        print("Training model...")
-        history = self.model.fit(
-            X_train, y_train,
-            epochs=epochs,
-            batch_size=batch_size,
-            validation_data=(X_test, y_test),
-            verbose=1
-        )
-        
-        # Save artifacts
-        self.model.save(self.model_path)
-        joblib.dump({
-            'scaler_X': self.scaler_X,
-            'scaler_y': self.scaler_y,
-            'encoders': self.label_encoders,
-            'features': feature_names
-        }, self.encoders_path)
-        
-        print("Model training complete and saved.")
-        
-        # Return metrics
-        loss = history.history['loss'][-1]
-        val_loss = history.history['val_loss'][-1]
-        
+    def dataset_paths(self):
+        # The vehicle table is merged into the training data when present
+        return [p for p in (self.data_path, 'models/data/data_sets/vehicle_data.csv') if os.path.exists(p)]
+
+    def classification_metrics(self, y_pred_scaled, y_test_scaled, scaler_y):
         # Calculate Classification Metrics for Traffic Index (Index 0)
-        y_pred_scaled = self.model.predict(X_test)
-        y_pred = self.scaler_y.inverse_transform(y_pred_scaled)
-        y_test_orig = self.scaler_y.inverse_transform(y_test)
+        y_pred = scaler_y.inverse_transform(y_pred_scaled)
+        y_test_orig = scaler_y.inverse_transform(y_test_scaled)
         
         # Traffic Index is at index 0
         threshold = 30 # Adjusted based on data distribution (75th percentile is 35)
@@ -147,78 +101,131 @@ class TrafficAnalyzer:
         from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
         
         return {
-            "status": "success",
-            "training_loss": loss,
-            "validation_loss": val_loss,
-            "mean_absolute_error": history.history['mae'][-1],
-            "val_mean_absolute_error": history.history['val_mae'][-1],
-            "epochs": epochs,
-            "classification_metrics": {
-                "accuracy": float(accuracy_score(y_test_class, y_pred_class)),
-                "precision": float(precision_score(y_test_class, y_pred_class, zero_division=0)),
-                "recall": float(recall_score(y_test_class, y_pred_class, zero_division=0)),
-                "f1_score": float(f1_score(y_test_class, y_pred_class, zero_division=0)),
-                "confusion_matrix": confusion_matrix(y_test_class, y_pred_class).tolist()
-            }
+            "accuracy": float(accuracy_score(y_test_class, y_pred_class)),
+            "precision": float(precision_score(y_test_class, y_pred_class, zero_division=0)),
+            "recall": float(recall_score(y_test_class, y_pred_class, zero_division=0)),
+            "f1_score": float(f1_score(y_test_class, y_pred_class, zero_division=0)),
+            "confusion_matrix": confusion_matrix(y_test_class, y_pred_class).tolist()
         }
 
+    def get_free_flow_speed(self, route_name):
+        # Determine freeFlowSpeed
+        # Heuristic matches simulator
+        ff_speed = 45 # Default Core
+        if "Highway" in route_name or "Expressway" in route_name:
+             ff_speed = 85
+        elif "IT" in route_name or "HITEC" in route_name or "Gachibowli" in route_name:
+             ff_speed = 60
+        return ff_speed
+
     def predict(self, route_name, time_str, day, season, is_peak=0, range_km=10.0):
-        # Load encoders if not in memory
-        if not self.label_encoders:
-            saved_data = joblib.load(self.encoders_path)
-            self.label_encoders = saved_data['encoders']
-            self.scaler_X = saved_data['scaler_X']
-            self.scaler_y = saved_data['scaler_y']
-            
-        if self.model is None:
-             self.model = tf.keras.models.load_model(self.model_path)
+        # Single-row wrapper around predict_many; repeat calls are answered from the raw inputs
+        # (time quantized to the bucket) without encoding anything. Only single rows are cached:
+        # for batches the per-row lookups cost more than the forward pass they would save
+        try:
+            hour, minute = (int(v) for v in str(time_str).split(":")[:2])
+            if not (0 <= hour < 24 and 0 <= minute < 60):
+                raise ValueError(f"time out of range: {time_str}")
+        except ValueError as e:
+            print(f"Prediction error: {e}")
+            return None
+        bucket = hour * 60 + minute
+        if self.time_bucket_minutes:
+            bucket -= bucket % self.time_bucket_minutes
+        key = (route_name, bucket, day, season, int(is_peak), round(float(range_km), 3))
+        cached = self.prediction_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        prediction = self.predict_many([route_name], f"{bucket // 60:02d}:{bucket % 60:02d}", day, season, is_peak, range_km)
+        if prediction is None or np.isnan(prediction[0]).any():
+            print(f"Prediction error: unknown route, day or season {(route_name, day, season)}")
+            return None
+        # Return tuple: (traffic_index, delivered_time, distribution_cost, customer_satisfaction)
+        result = (float(prediction[0][0]), float(prediction[0][1]), float(prediction[0][2]), float(prediction[0][3]))
+        self.prediction_cache.set(key, result)
+        return result
+
+    def parse_hours(self, values):
+        # "HH:MM" / "HH:MM:SS" strings (or numeric hours) to fractional hours, vectorized;
+        # unparseable or out-of-range times become NaN
+        values = pd.Series(values)
+        if pd.api.types.is_numeric_dtype(values):
+            hours = values.to_numpy(dtype=float)
+            return np.where((0 <= hours) & (hours < 24), hours, np.nan)
+        parts = values.astype(str).str.split(":", expand=True)
+        hour = pd.to_numeric(parts[0], errors='coerce').to_numpy(dtype=float)
+        minute = pd.to_numeric(parts[1], errors='coerce').to_numpy(dtype=float) if parts.shape[1] > 1 else np.full(len(values), np.nan)
+        valid = (0 <= hour) & (hour < 24) & (0 <= minute) & (minute < 60)
+        return np.where(valid, hour + minute / 60.0, np.nan)
+
+    def encode_column(self, encoder, values):
+        # Label codes for values, with a mask of the ones the encoder has seen (others code to 0)
+        values = np.asarray(values, dtype=object)
+        known = np.isin(values, encoder.classes_)
+        codes = np.zeros(len(values))
+        if known.any():
+            codes[known] = encoder.transform(values[known])
+        return codes, known
+
+    def predict_many(self, routes, time_str=None, day=None, season=None, is_peak=0, range_km=10.0, vehicle=None):
+        """
+        Batched predict(): encodes and scales all rows at once and runs a single model forward pass.
+        routes is either a DataFrame with columns route, time (or time_str), day, season and optionally
+        is_peak, range_km and the vehicle attributes in VEHICLE_FEATURES, or a list of route names; then
+        time_str, day, season, is_peak, range_km and the vehicle dict entries may be scalars or per-row arrays.
+        Missing vehicle attributes use the fleet averages.
+        Returns an (n, 4) array of [traffic_index, delivered_time, distribution_cost, customer_satisfaction];
+        rows with a route, day or season the model was not trained on, or an invalid time, are NaN
+        and do not affect the others.
+        """
+        artifacts = self.load_artifacts()
+        encoders = artifacts['encoders']
 
-        # Preprocess Input
         try:
-            dt = pd.to_datetime(time_str, format='%H:%M')
-            hour = dt.hour + (dt.minute / 60.0)
-            
-            # Encode inputs safely (handle unseen labels if necessary, for now assuming validity)
-            route_enc = self.label_encoders['route'].transform([route_name])[0]
-            day_enc = self.label_encoders['day_of_the_week'].transform([day])[0]
-            season_enc = self.label_encoders['season'].transform([season])[0]
-            
-            # Construct feature vector
-            # ['route', 'hour', 'day_of_the_week', 'season', 'is_peak', 'range_km']
-
-            # Determine freeFlowSpeed
-            # Heuristic matches simulator
-            ff_speed = 45 # Default Core
-            if "Highway" in route_name or "Expressway" in route_name:
-                 ff_speed = 85
-            elif "IT" in route_name or "HITEC" in route_name or "Gachibowli" in route_name:
-                 ff_speed = 60
-            
-            # Default Vehicle Attributes for Prediction (Average values from simulator)
-            # Future improvement: Allow passing vehicle_id to predict()
-            avg_fuel_eff = 15.0
-            avg_cooling = 95.0
-            avg_age = 5.0
-            avg_load = 8000.0
-            
-            # ['route', 'hour', 'day_of_the_week', 'season', 'is_peak', 'range_km', 'freeFlowSpeed', 
+            if isinstance(routes, pd.DataFrame):
+                df = routes
+                route_names = df['route'].to_numpy()
+                time_str = df['time'] if 'time' in df.columns else df['time_str']
+                day, season = df['day'], df['season']
+                is_peak = df['is_peak'] if 'is_peak' in df.columns else is_peak
+                range_km = df['range_km'] if 'range_km' in df.columns else range_km
+                vehicle = {k: df[k] for k in VEHICLE_FEATURES if k in df.columns}
+            else:
+                route_names = np.asarray(routes, dtype=object)
+            n = len(route_names)
+            vehicle = vehicle or {}
+
+            def column(value):
+                return np.broadcast_to(np.asarray(value), (n,))
+
+            hour = self.parse_hours(column(time_str))
+            route_enc, route_known = self.encode_column(encoders['route'], route_names)
+            day_enc, day_known = self.encode_column(encoders['day_of_the_week'], column(day))
+            season_enc, season_known = self.encode_column(encoders['season'], column(season))
+            valid = route_known & day_known & season_known & ~np.isnan(hour)
+            result = np.full((n, 4), np.nan)
+            if not valid.any():
+                return result
+
+            # Free-flow speed once per distinct route
+            unique, inverse = np.unique(route_names.astype(str), return_inverse=True)
+            ff_speed = np.array([self.get_free_flow_speed(r) for r in unique], dtype=float)[inverse]
+
+            # ['route', 'hour', 'day_of_the_week', 'season', 'is_peak', 'range_km', 'freeFlowSpeed',
             #  'fuel_efficiency_l100km', 'cooling_efficiency_percent', 'years_in_service', 'max_load_kg']
-            features = np.array([[route_enc, hour, day_enc, season_enc, is_peak, range_km, ff_speed, 
-                                  avg_fuel_eff, avg_cooling, avg_age, avg_load]])
-            
-            # Scale
-            features_scaled = self.scaler_X.transform(features)
-            
-            # Reshape
-            features_reshaped = features_scaled.reshape((1, 1, features_scaled.shape[1]))
-            
-            # Predict
-            prediction_scaled = self.model.predict(features_reshaped)
-            prediction = self.scaler_y.inverse_transform(prediction_scaled)
-            
-            # Return tuple: (traffic_index, delivered_time, distribution_cost, customer_satisfaction)
-            return float(prediction[0][0]), float(prediction[0][1]), float(prediction[0][2]), float(prediction[0][3])
-            
+            features = np.column_stack(
+                [route_enc, hour, day_enc, season_enc, column(is_peak), column(range_km), ff_speed]
+                + [column(vehicle.get(k, default)) for k, default in VEHICLE_FEATURES.items()]
+            ).astype(float)[valid]
+
+            features_scaled = artifacts['scaler_X'].transform(features)
+            features_reshaped = features_scaled.reshape((len(features), 1, features_scaled.shape[1]))
+
+            prediction_scaled = artifacts['model'].predict(features_reshaped, verbose=0)
+            result[valid] = artifacts['scaler_y'].inverse_transform(prediction_scaled)
+            return result
+
         except Exception as e:
             print(f"Prediction error: {e}")
             return None
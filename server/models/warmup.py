@@ -0,0 +1,62 @@
+import threading
+import time
+
+
+class WarmUp:
+    """
+    Runs named start-up steps (heavy imports, model and data loads) one after another on a
+    background thread so the server can answer requests while they happen. Each step records
+    its status, duration and error; the service is ready once every required step is done.
+    A failed optional step does not block readiness, the endpoints load it on first use.
+    """
+    def __init__(self):
+        self.steps = []
+        self.status = {}
+        self.lock = threading.Lock()
+        self.thread = None
+        self.started_at = None
+        self.finished_at = None
+
+    def add(self, name, fn, required=True):
+        self.steps.append((name, fn, required))
+        self.status[name] = {"status": "pending", "required": required, "seconds": None, "error": None}
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.started_at = time.perf_counter()
+        self.thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        for name, fn, _ in self.steps:
+            self.update(name, status="running")
+            start = time.perf_counter()
+            try:
+                fn()
+                self.update(name, status="done", seconds=round(time.perf_counter() - start, 3))
+            except Exception as e:
+                print(f"Warm-up step {name} failed: {e}")
+                self.update(name, status="failed", seconds=round(time.perf_counter() - start, 3), error=str(e))
+        self.finished_at = time.perf_counter()
+
+    def update(self, name, **fields):
+        with self.lock:
+            self.status[name].update(fields)
+
+    def ready(self):
+        with self.lock:
+            return all(s["status"] == "done" for s in self.status.values() if s["required"])
+
+    def report(self):
+        with self.lock:
+            steps = {name: dict(s) for name, s in self.status.items()}
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        return {
+            "ready": self.ready(),
+            "finished": self.finished_at is not None,
+            "seconds": round(elapsed, 3) if elapsed is not None else None,
+            "steps": steps
+        }
@@ -1,57 +1,36 @@
 import pandas as pd
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
-from sklearn.preprocessing import MinMaxScaler, LabelEncoder
-from sklearn.model_selection import train_test_split
-import joblib
-import os
+from models.cache_utils import TTLCache
+from models.lstm_analyzer import LSTMAnalyzer
+
+class WeatherAnalyzer(LSTMAnalyzer):
+    default_epochs = 50
+    # Target: rain_mm and temp_c (rain is the critical one for logistics)
+    categorical_columns = ['location', 'season']
+    feature_columns = ['location', 'hour', 'season']
+    target_columns = ['rain_mm', 'temp_c']
 
-class WeatherAnalyzer:
     def __init__(self, data_path='models/data/data_sets/hyderabad_hourly_weather_data.csv'):
-        self.data_path = data_path
-        self.model = None
-        self.scaler_X = MinMaxScaler()
-        self.scaler_y = MinMaxScaler()
-        self.label_encoders = {}
-        self.model_path = 'models/saved/weather_lstm.keras'
-        self.encoders_path = 'models/saved/weather_encoders.pkl'
+        super().__init__('weather', data_path)
         
-        os.makedirs('models/saved', exist_ok=True)
+        # (location, hour, season) -> prediction; flushed when the model or encoders on disk change
+        self.prediction_cache = TTLCache(
+            max_size=1024, ttl_seconds=900.0,
+            watch_paths=(self.model_path, self.encoders_path)
+        )
 
     def load_data(self):
         return pd.read_csv(self.data_path)
 
-    def preprocess(self, df):
+    def add_features(self, df):
         # Convert timestamp to hour
         df['hour'] = pd.to_datetime(df['timestamp']).dt.hour
-        
-        # Features: location, hour, season
-        # Target: rain_mm (could also multi-output predict temp_c, but treating rain as critical due to logistics)
-        
-        le_loc = LabelEncoder()
-        df['location'] = le_loc.fit_transform(df['location'])
-        self.label_encoders['location'] = le_loc
-        
-        le_sea = LabelEncoder()
-        df['season'] = le_sea.fit_transform(df['season'])
-        self.label_encoders['season'] = le_sea
-        
-        features = ['location', 'hour', 'season']
-        target = ['rain_mm', 'temp_c'] # Multi-target
-        
-        X = df[features].values
-        y = df[target].values
-        
-        X_scaled = self.scaler_X.fit_transform(X)
-        y_scaled = self.scaler_y.fit_transform(y)
-        
-        X_reshaped = X_scaled.reshape((X_scaled.shape[0], 1, X_scaled.shape[1]))
-        
-        return X_reshaped, y_scaled, features
 
     def build_model(self, input_shape):
+        # TensorFlow is only needed for training; serving goes through models.inference
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import LSTM, Dense, Dropout
+        
         model = Sequential()
         model.add(LSTM(64, return_sequences=True, input_shape=input_shape))
         model.add(Dropout(0.2))
@@ -63,33 +42,11 @@ class WeatherAnalyzer:
         model.compile(optimizer='adam', loss='mse', metrics=['mae'])
         return model
 
-    def train_model(self, epochs=50, batch_size=32):
-        print("Loading and preprocessing weather data...")
-        df = self.load_data()
-        X, y, feature_names = self.preprocess(df)
-        
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        
-        print("Building Weather LSTM Model...")
-        self.model = self.build_model(X.shape[1:])
-        
-        print("Training model...")
-        history = self.model.fit(X_train, y_train, epochs=epochs, batch_size=batch_size, validation_data=(X_test, y_test), verbose=1)
-        
-        self.model.save(self.model_path)
-        joblib.dump({
-            'scaler_X': self.scaler_X,
-            'scaler_y': self.scaler_y,
-            'encoders': self.label_encoders,
-            'features': feature_names
-        }, self.encoders_path)
-        
-        print("Weather model saved.")
+    def classification_metrics(self, y_pred_scaled, y_test_scaled, scaler_y):
         # Calculate Classification Metrics (Rain > 0.5mm = Rainy)
         # y_test has shape (samples, 2) -> [rain, temp]
-        y_pred_scaled = self.model.predict(X_test)
-        y_pred = self.scaler_y.inverse_transform(y_pred_scaled)
-        y_test_orig = self.scaler_y.inverse_transform(y_test)
+        y_pred = scaler_y.inverse_transform(y_pred_scaled)
+        y_test_orig = scaler_y.inverse_transform(y_test_scaled)
 
         # Slice 0 for rain
         y_pred_rain = y_pred[:, 0]
@@ -102,46 +59,40 @@ class WeatherAnalyzer:
         from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
 
         return {
-            "status": "success",
-            "training_loss": history.history['loss'][-1],
-            "validation_loss": history.history['val_loss'][-1],
-            "mean_absolute_error": history.history['mae'][-1],
-            "val_mean_absolute_error": history.history['val_mae'][-1],
-            "epochs": epochs,
-            "classification_metrics": {
-                "accuracy": float(accuracy_score(y_test_class, y_pred_class)),
-                "precision": float(precision_score(y_test_class, y_pred_class, zero_division=0)),
-                "recall": float(recall_score(y_test_class, y_pred_class, zero_division=0)),
-                "f1_score": float(f1_score(y_test_class, y_pred_class, zero_division=0)),
-                "confusion_matrix": confusion_matrix(y_test_class, y_pred_class).tolist()
-            }
+            "accuracy": float(accuracy_score(y_test_class, y_pred_class)),
+            "precision": float(precision_score(y_test_class, y_pred_class, zero_division=0)),
+            "recall": float(recall_score(y_test_class, y_pred_class, zero_division=0)),
+            "f1_score": float(f1_score(y_test_class, y_pred_class, zero_division=0)),
+            "confusion_matrix": confusion_matrix(y_test_class, y_pred_class).tolist()
         }
 
     def predict(self, location, hour, season):
-        if not self.label_encoders:
-            saved_data = joblib.load(self.encoders_path)
-            self.label_encoders = saved_data['encoders']
-            self.scaler_X = saved_data['scaler_X']
-            self.scaler_y = saved_data['scaler_y']
-            
-        if self.model is None:
-             self.model = tf.keras.models.load_model(self.model_path)
+        # The model is trained on whole hours, so the hour is the time bucket
+        key = (location, int(hour), season)
+        cached = self.prediction_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+        
+        artifacts = self.load_artifacts()
+        encoders = artifacts['encoders']
              
         try:
-            loc_enc = self.label_encoders['location'].transform([location])[0]
-            sea_enc = self.label_encoders['season'].transform([season])[0]
+            loc_enc = encoders['location'].transform([location])[0]
+            sea_enc = encoders['season'].transform([season])[0]
             
-            features = np.array([[loc_enc, hour, sea_enc]])
-            features_scaled = self.scaler_X.transform(features)
+            features = np.array([[loc_enc, key[1], sea_enc]])
+            features_scaled = artifacts['scaler_X'].transform(features)
             features_reshaped = features_scaled.reshape((1, 1, features_scaled.shape[1]))
             
-            prediction_scaled = self.model.predict(features_reshaped)
-            prediction = self.scaler_y.inverse_transform(prediction_scaled)
+            prediction_scaled = artifacts['model'].predict(features_reshaped, verbose=0)
+            prediction = artifacts['scaler_y'].inverse_transform(prediction_scaled)
             
-            return {
+            result = {
                 "rain_mm": float(prediction[0][0]),
                 "temp_c": float(prediction[0][1])
             }
+            self.prediction_cache.set(key, result)
+            return dict(result)
         except Exception as e:
             print(f"Weather prediction error: {e}")
             return None
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The server resolves its data and model paths relative to server/ (where uvicorn is started)
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+os.chdir(SERVER_DIR)
@@ -0,0 +1,63 @@
+import os
+import types
+from models import cache_utils
+from models.cache_utils import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_utils, "time", types.SimpleNamespace(monotonic=clock.monotonic, time=clock.monotonic))
+    cache = TTLCache(max_size=4, ttl_seconds=10.0)
+    cache.set("a", 1)
+
+    clock.now += 9.9
+    assert cache.get("a") == 1
+    clock.now += 0.2
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 0)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_size=2, ttl_seconds=60.0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_flushes_when_watched_file_mtime_changes(tmp_path):
+    model = tmp_path / "model.keras"
+    model.write_bytes(b"v1")
+    cache = TTLCache(max_size=8, ttl_seconds=float("inf"), watch_paths=(str(model),))
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    # Same size, only the mtime moves (a retrain writing an equally sized file)
+    st = os.stat(model)
+    os.utime(model, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert cache.get("a") is None
+    assert cache.stats()["flushes"] == 1
+
+    cache.set("a", 2)
+    assert cache.get("a") == 2
+    assert cache.stats()["flushes"] == 1
+
+
+def test_flushes_when_watched_file_appears(tmp_path):
+    model = tmp_path / "model.keras"
+    cache = TTLCache(watch_paths=(str(model),))
+    cache.set("a", 1)
+    model.write_bytes(b"v1")
+    assert cache.get("a") is None
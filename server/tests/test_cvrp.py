@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from models.optimization.cvrp import IQPSO_CVRP, split_tour
+
+
+def brute_force_split(demand, legs, depot_km, capacity, route_cost_km):
+    # Every way to cut the tour into consecutive routes; stops are 0-indexed here
+    n = len(demand)
+    best = float("inf")
+    for mask in range(2 ** (n - 1)):
+        cuts = [0] + [k + 1 for k in range(n - 1) if mask >> k & 1] + [n]
+        total = 0.0
+        for i, j in zip(cuts[:-1], cuts[1:]):
+            if demand[i:j].sum() > capacity:
+                break
+            total += depot_km[i] + legs[i:j - 1].sum() + depot_km[j - 1] + route_cost_km
+        else:
+            best = min(best, total)
+    return best
+
+
+def split_inputs(demand, legs, depot_km):
+    # 1-indexed arrays split_tour expects (index 0 = depot)
+    loads = np.concatenate([[0.0], np.cumsum(demand)])
+    along = np.concatenate([[0.0, 0.0], np.cumsum(legs)])
+    return loads.tolist(), along.tolist(), np.concatenate([[0.0], depot_km]).tolist()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_split_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 9))
+    demand = rng.integers(1, 10, n).astype(float)
+    legs = rng.uniform(1, 20, max(n - 1, 0))
+    depot_km = rng.uniform(1, 20, n)
+    capacity = float(max(demand.max(), rng.integers(5, 25)))
+    route_cost_km = float(rng.choice([0.0, 15.0]))
+
+    loads, along, depot = split_inputs(demand, legs, depot_km)
+    total, pred = split_tour(loads, along, depot, capacity, route_cost_km)
+    assert total == pytest.approx(brute_force_split(demand, legs, depot_km, capacity, route_cost_km))
+
+    # The predecessor chain is a capacity-feasible cut of the tour
+    j = n
+    while j > 0:
+        assert demand[pred[j]:j].sum() <= capacity
+        j = pred[j]
+
+
+def test_swarm_split_matches_brute_force():
+    rng = np.random.default_rng(3)
+    orders = pd.DataFrame({
+        "order_id": np.arange(1, 8),
+        "lat": 17.4 + rng.uniform(-0.1, 0.1, 7),
+        "lon": 78.45 + rng.uniform(-0.1, 0.1, 7),
+        "quantity_kg": rng.integers(100, 600, 7).astype(float)
+    })
+    fleet = pd.DataFrame({"vehicle_id": ["V1", "V2", "V3"], "max_load_kg": [1200.0, 1500.0, 1300.0]})
+    optimizer = IQPSO_CVRP(orders, fleet, num_particles=5)
+    tours = np.array([rng.permutation(7) for _ in range(5)])
+
+    distance_km, routes, _ = optimizer.split(tours)
+    route_cost_km = optimizer.fixed_vehicle_cost / optimizer.cost_per_km
+    for tour, distance, count in zip(tours, distance_km, routes):
+        legs = optimizer.leg_km(tour[:-1], tour[1:])
+        expected = brute_force_split(optimizer.demand[tour], legs, optimizer.depot_km[tour], optimizer.capacity,
+                                     route_cost_km)
+        assert distance + count * route_cost_km == pytest.approx(expected)
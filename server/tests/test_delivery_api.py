@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+import main
+from models.traffic_analyzer import traffic_analyzer
+
+client = TestClient(main.app)
+
+
+def known(column):
+    return list(traffic_analyzer.load_artifacts()['encoders'][column].classes_)
+
+
+def test_predict_many_isolates_invalid_rows():
+    route = known('route')[0]
+    day, season = known('day_of_the_week')[0], known('season')[0]
+    batch = pd.DataFrame({
+        "route": [route, "Bogus", route, route, route],
+        "time": ["08:00", "08:00", "25:99", "08:00", "17:30"],
+        "day": [day, day, day, "Someday", day],
+        "season": [season] * 5,
+        "range_km": [12.0] * 5
+    })
+    predictions = traffic_analyzer.predict_many(batch)
+
+    assert np.isnan(predictions[1:4]).all()
+    for i in (0, 4):
+        row = batch.iloc[i]
+        expected = traffic_analyzer.predict(row["route"], row["time"], day, season, 0, 12.0)
+        np.testing.assert_allclose(predictions[i], expected, rtol=1e-5)
+
+
+def test_predict_returns_none_for_invalid_time():
+    route, day, season = known('route')[0], known('day_of_the_week')[0], known('season')[0]
+    assert traffic_analyzer.predict(route, "25:99", day, season) is None
+
+
+def test_predict_deliveries_returns_one_result_per_row():
+    routes = known('route')[:2]
+    deliveries = [{"route_name": r, "range_km": 8.0, "start_time": "09:15"} for r in routes]
+    response = client.post("/overall/predict_deliveries", json={"deliveries": deliveries})
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 2
+
+
+@pytest.mark.parametrize("bad, message", [
+    ({"route_name": "Bogus"}, "Unknown route"),
+    ({"start_time": "25:99"}, "Invalid start_time"),
+    ({"start_time": "noon"}, "Invalid start_time")
+])
+def test_predict_deliveries_bad_row_is_400(bad, message):
+    good = {"route_name": known('route')[0], "range_km": 8.0, "start_time": "09:15"}
+    response = client.post("/overall/predict_deliveries", json={"deliveries": [good, {**good, **bad}]})
+    assert response.status_code == 400
+    assert message in response.json()["detail"]
+    assert "[1]" in response.json()["detail"]
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from models.optimization.iqpso_sa import IQPSO_SA
+
+
+def leg_tables(optimizer, depart_minute, seed=0):
+    # Random time-dependent leg tensors over the optimizer's locations, one matrix per bucket
+    rng = np.random.default_rng(seed)
+    n_buckets = 24 * 60 // optimizer.time_bucket_minutes
+    shape = (n_buckets, optimizer.dim, optimizer.dim)
+    return {
+        "dist_km": rng.uniform(1, 30, shape[1:]),
+        "time": rng.uniform(5, 60, shape),
+        "cost": rng.uniform(50, 350, shape),
+        "sat": rng.uniform(0, 10, shape),
+        "depart_minute": depart_minute
+    }
+
+
+def scalar_cost(optimizer, position):
+    # Reference: walk one route leg by leg, looking each leg up in the bucket it departs in
+    perm = np.argsort(position)
+    clock = float(optimizer.depart_minute)
+    total_time = total_cost = total_sat = 0.0
+    for a, b in zip(perm[:-1], perm[1:]):
+        bucket = int(clock // optimizer.time_bucket_minutes) % len(optimizer.leg_time_td)
+        leg_time = optimizer.leg_time_td[bucket, a, b]
+        total_time += leg_time
+        total_cost += optimizer.leg_cost_td[bucket, a, b]
+        total_sat += optimizer.leg_sat_td[bucket, a, b]
+        clock += leg_time
+    objective = optimizer.w1 * total_cost / optimizer.max_cost + optimizer.w2 * (1.0 - total_sat / optimizer.max_sat)
+    return objective, total_cost, total_sat, total_time
+
+
+@pytest.mark.parametrize("depart_minute", [0, 8 * 60 + 7, 23 * 60 + 50])
+def test_evaluate_batch_matches_scalar_cost(depart_minute):
+    optimizer = IQPSO_SA(num_particles=40)
+    optimizer.load_leg_tables(leg_tables(optimizer, depart_minute))
+    positions = np.random.default_rng(1).uniform(-10, 10, (40, optimizer.dim))
+
+    batch = optimizer.evaluate_batch(positions)
+    for k, position in enumerate(positions):
+        expected = scalar_cost(optimizer, position)
+        assert np.allclose([column[k] for column in batch], expected)
+        assert np.allclose(optimizer.evaluate(position), expected)
+
+
+def test_evaluate_batch_pinned_start_is_first():
+    optimizer = IQPSO_SA(num_particles=10).subproblem(["Uppal", "Medchal", "Gachibowli"], start="Kompally")
+    optimizer.load_leg_tables(leg_tables(optimizer, 9 * 60))
+    optimizer.initialize()
+    assert (np.argsort(optimizer.particles, axis=1)[:, 0] == 0).all()
+    fit, _, _, _ = optimizer.evaluate_batch(optimizer.particles)
+    assert np.allclose(fit, [scalar_cost(optimizer, p)[0] for p in optimizer.particles])
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+
+from models import inference
+from models.inference import NumpyLSTM, export_npz, is_stale
+
+
+def build_model(timesteps, features, seed):
+    tf.keras.utils.set_random_seed(seed)
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(timesteps, features)),
+        tf.keras.layers.LSTM(16, return_sequences=True),
+        tf.keras.layers.Dropout(0.2),
+        tf.keras.layers.LSTM(8),
+        tf.keras.layers.Dense(6, activation="relu"),
+        tf.keras.layers.Dense(3)
+    ])
+    # Non-zero biases so the bias terms are checked too
+    for layer in model.layers:
+        weights = layer.get_weights()
+        if weights:
+            layer.set_weights(weights[:-1] + [np.random.default_rng(seed).normal(0, 0.1, weights[-1].shape)])
+    return model
+
+
+@pytest.mark.parametrize("timesteps", [1, 5])
+def test_numpy_backend_matches_keras(tmp_path, timesteps):
+    model = build_model(timesteps, 7, seed=timesteps)
+    model_path = str(tmp_path / "model.keras")
+    model.save(model_path)
+    npz_path = export_npz(model_path)
+
+    x = np.random.default_rng(0).normal(size=(64, timesteps, 7)).astype(np.float32)
+    expected = model.predict(x, verbose=0)
+    np.testing.assert_allclose(NumpyLSTM(npz_path).predict(x), expected, atol=1e-5)
+    if timesteps == 1:
+        # 2-D rows are treated as a single timestep
+        np.testing.assert_allclose(NumpyLSTM(npz_path).predict(x[:, 0]), expected, atol=1e-5)
+
+
+def test_export_goes_stale_when_model_content_changes(tmp_path):
+    model_path = str(tmp_path / "model.keras")
+    build_model(1, 4, seed=1).save(model_path)
+    npz_path = export_npz(model_path)
+    assert not is_stale(npz_path, model_path)
+
+    build_model(1, 4, seed=2).save(model_path)
+    assert is_stale(npz_path, model_path)
+    assert not is_stale(export_npz(model_path), model_path)
+
+
+def test_saved_traffic_model_numpy_matches_keras():
+    from models.traffic_analyzer import traffic_analyzer
+    X_test, _ = traffic_analyzer.evaluation_split()
+    numpy_model = inference.load_model(traffic_analyzer.model_path, "numpy")
+    keras_model = inference.load_model(traffic_analyzer.model_path, "keras")
+    np.testing.assert_allclose(numpy_model.predict(X_test), keras_model.predict(X_test, verbose=0), atol=1e-5)
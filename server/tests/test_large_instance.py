@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+from models.optimization.local_search import two_opt_candidates
+
+
+def open_cost(perm, D):
+    perm = np.asarray(perm)
+    return float(D[perm[:-1], perm[1:]].sum())
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_two_opt_candidates_delta_matches_full_evaluation(seed):
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, 100, (30, 2))
+    D = np.linalg.norm(xy[:, None] - xy[None], axis=2)
+    neighbors = np.argsort(D, axis=1)[:, 1:6]
+    perm = rng.permutation(30)
+    new_perm, delta = two_opt_candidates(perm, lambda a, b: D[a, b], neighbors)
+    assert sorted(new_perm) == list(range(30))
+    assert delta < 0
+    assert open_cost(new_perm, D) - open_cost(perm, D) == pytest.approx(delta)
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from models.optimization.local_search import close_route, improve_route, or_opt_pass, two_opt_cycle, two_opt_pass
+
+
+def open_cost(perm, W):
+    perm = np.asarray(perm)
+    return float(W[perm[:-1], perm[1:]].sum())
+
+
+def closed_cost(tour, W):
+    tour = np.asarray(tour)
+    return float(W[tour, np.roll(tour, -1)].sum())
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_two_opt_and_or_opt_deltas_match_full_evaluation(seed):
+    rng = np.random.default_rng(seed)
+    W = rng.uniform(1, 100, (9, 9))  # asymmetric
+    tour, Wc = close_route(rng.permutation(9), W)
+    for move in (two_opt_pass, or_opt_pass):
+        while True:
+            before = closed_cost(tour, Wc)
+            moved, delta = move(tour, Wc)
+            if not moved:
+                break
+            assert delta < 0
+            assert closed_cost(tour, Wc) - before == pytest.approx(delta)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_improve_route_delta_matches_full_evaluation(seed):
+    rng = np.random.default_rng(seed)
+    W = rng.uniform(1, 100, (10, 10))
+    perm = rng.permutation(10)
+    new_perm, delta = improve_route(perm, W)
+    assert sorted(new_perm) == list(range(10))
+    assert delta <= 0
+    assert open_cost(new_perm, W) - open_cost(perm, W) == pytest.approx(delta)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_two_opt_cycle_delta_matches_full_evaluation(seed):
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, 100, (12, 2))
+    D = np.linalg.norm(xy[:, None] - xy[None], axis=2)
+    tour = np.concatenate([[0], rng.permutation(np.arange(1, 12))])
+    new_tour, delta = two_opt_cycle(tour, D)
+    assert new_tour[0] == 0
+    assert sorted(new_tour) == list(range(12))
+    assert closed_cost(new_tour, D) - closed_cost(tour, D) == pytest.approx(delta)
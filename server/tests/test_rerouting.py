@@ -0,0 +1,69 @@
+import pytest
+from fastapi.testclient import TestClient
+import main
+from models.optimization.iqpso_sa import IQPSO_SA
+from models.optimization.rerouting import ReroutingService
+
+client = TestClient(main.app)
+
+
+@pytest.fixture(scope="module")
+def service():
+    # Background thread is never started; events are applied by hand
+    service = ReroutingService(IQPSO_SA(), replan_budget_ms=50.0)
+    stops = service.optimizer.universe[:4]
+    service.create_plan("van-1", stops, "09:00")
+    return service
+
+
+def test_create_plan_rejects_duplicate_stops(service):
+    a, b = service.optimizer.universe[:2]
+    with pytest.raises(ValueError, match="Duplicate stops"):
+        service.create_plan("van-2", [a, b, a])
+    assert service.get_plan("van-2") is None
+
+
+def test_seed_to_position_rejects_duplicates():
+    optimizer = IQPSO_SA()
+    a, b = optimizer.locations[:2]
+    with pytest.raises(ValueError):
+        optimizer.seed_to_position([a, b, a])
+
+
+def test_add_order_rejects_visited_and_current_stop(service):
+    plan = service.get_plan("van-1")
+    with pytest.raises(ValueError):
+        service.add_order("van-1", plan["route"][0])
+
+    service.mark_visited("van-1", plan["route"][1])
+    for location in service.get_plan("van-1")["route"][:2]:
+        with pytest.raises(ValueError):
+            service.add_order("van-1", location)
+    assert service.events.empty()
+
+
+def test_add_order_rejects_unknown_location_and_plan(service):
+    with pytest.raises(ValueError):
+        service.add_order("van-1", "Nowhere")
+    with pytest.raises(KeyError):
+        service.add_order("van-9", service.optimizer.universe[0])
+
+
+def test_orders_never_duplicate_a_stop(service):
+    route = service.get_plan("van-1")["route"]
+    new = service.optimizer.universe[4]
+    affected = service.apply_events([
+        {"type": "order", "vehicle_id": "van-1", "location": new},
+        {"type": "order", "vehicle_id": "van-1", "location": new},
+        {"type": "order", "vehicle_id": "van-1", "location": route[0]}
+    ])
+    assert affected == {"van-1": "new_order"}
+    route = service.get_plan("van-1")["route"]
+    assert len(route) == len(set(route)) == 5
+
+
+def test_plan_with_duplicate_stops_is_400():
+    a, b = main.get_optimizer().universe[:2]
+    response = client.post("/rerouting/plans", json={"vehicle_id": "van-x", "stops": [a, b, a]})
+    assert response.status_code == 400
+    assert "Duplicate" in response.json()["detail"]
@@ -0,0 +1,32 @@
+import pytest
+from fastapi.testclient import TestClient
+import main
+from models.optimization.iqpso_sa import IQPSO_SA
+
+client = TestClient(main.app)
+
+
+@pytest.mark.parametrize("start_time", ["25:99", "24:00", "12:60", "-1:30", "abc"])
+def test_time_context_rejects_bad_start_time(start_time):
+    with pytest.raises(ValueError):
+        IQPSO_SA().get_time_context(start_time)
+
+
+def test_time_context_keeps_valid_start_time():
+    assert IQPSO_SA().get_time_context("23:59")["depart_minute"] == 23 * 60 + 59
+
+
+@pytest.mark.parametrize("payload", [
+    {"start_time": "25:99"},
+    {"start_time": "abc"},
+    {"start_time": "25:99", "islands": 2},
+    {"start_time": "25:99", "pareto": True}
+])
+def test_run_routing_bad_start_time_is_400(payload):
+    assert client.post("/optimization/run_routing", json=payload).status_code == 400
+
+
+def test_routing_job_bad_start_time_is_400():
+    response = client.post("/optimization/jobs", json={"start_time": "25:99"})
+    assert response.status_code == 400
+    assert "start_time" in response.json()["detail"]